@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, TypeVar
+
+from flask import Flask, current_app
+
+import ckan.plugins.toolkit as tk
+from ckan import model
+
+from ckanext.syndicate import config, registry
+from ckanext.syndicate.model import LogBuffer, SyndicationLog
+from ckanext.syndicate.types import Profile, Topic
+
+log = logging.getLogger(__name__)
+T = TypeVar("T")
+
+
+class ForegroundSync:
+    """Syndicate packages in the foreground.
+
+    With more than one worker, packages are syndicated by a bounded pool of
+    threads. Every profile gets its own pool of `workers` threads, so a slow
+    remote portal does not hold back syndication to other portals. Each thread
+    works inside its own request context and database session.
+
+    `results` counts syndication outcomes as `(profile ID, state)` pairs.
+
+    Example:
+        with ForegroundSync(4) as pool:
+            for package_id, profile in tasks:
+                pool.submit(package_id, profile)
+
+        print(pool.results)
+
+    """
+
+    def __init__(self, workers: int = 1, force: bool = False):
+        self.workers = workers
+        self.force = force
+        self.results: Counter[tuple[str, str]] = Counter()
+
+        self._app = current_app._get_current_object() if workers > 1 else None  # type: ignore
+        self._log = LogBuffer(config.get_batch_size())
+        self._executors: dict[str, ThreadPoolExecutor] = {}
+        self._pending: set[Future[tuple[str, str]]] = set()
+
+    def __enter__(self) -> ForegroundSync:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.join()
+
+    def submit(self, package_id: str, profile: Profile, topic: Topic = Topic.update) -> None:
+        """Schedule syndication, waiting if too many tasks are in progress."""
+        if self._app is None:
+            self.results[(profile.id, self._call(package_id, profile, topic))] += 1
+            return
+
+        if profile.id not in self._executors:
+            self._executors[profile.id] = ThreadPoolExecutor(self.workers, thread_name_prefix=f"syndicate-{profile.id}")
+
+        while len(self._pending) >= 2 * self.workers * len(self._executors):
+            self._collect(FIRST_COMPLETED)
+
+        self._pending.add(self._executors[profile.id].submit(self._sync, package_id, profile, topic))
+
+    def wait(self) -> None:
+        """Wait until all scheduled syndications are completed and logged."""
+        self._collect(ALL_COMPLETED)
+        self._log.flush()
+
+    def join(self) -> None:
+        """Wait until all scheduled syndications are completed and stop workers."""
+        self.wait()
+        for executor in self._executors.values():
+            executor.shutdown()
+        self._executors.clear()
+
+    def _collect(self, return_when: str) -> None:
+        done, self._pending = wait(self._pending, return_when=return_when)
+        for future in done:
+            self.results[future.result()] += 1
+
+    def _sync(self, package_id: str, profile: Profile, topic: Topic) -> tuple[str, str]:
+        return profile.id, isolated(self._app, self._call, package_id, profile, topic)  # type: ignore
+
+    def _call(self, package_id: str, profile: Profile, topic: Topic) -> str:
+        return sync_logged(package_id, profile, self._log, topic, self.force)
+
+
+def isolated(app: Flask, func: Callable[..., T], *args: Any) -> T:
+    """Call function inside its own request context and database session.
+
+    Used by worker threads, that do not share the context of the main thread.
+    """
+    with app.test_request_context():
+        tk.g.syndication = True
+        try:
+            return func(*args)
+        finally:
+            model.Session.remove()
+
+
+def sync_logged(
+    package_id: str,
+    profile: Profile,
+    buffer: LogBuffer,
+    topic: Topic = Topic.update,
+    force: bool = False,
+) -> str:
+    """Syndicate package, writing syndication log into the buffer.
+
+    Returns the state of the syndication. Failures are logged instead of
+    being raised.
+    """
+    log.info("Sync package %s, with action %s to the %s", package_id, topic.name, profile.id)
+    try:
+        result = tk.get_action("syndicate_sync")(
+            {"ignore_auth": True, "syndication_log": buffer},  # type: ignore
+            {"id": package_id, "topic": topic.name, "profile": profile.id, "force": force},
+        )
+    except Exception:  # noqa: BLE001
+        log.exception("Syndication of %s to profile %s failed", package_id, profile.id)
+        return SyndicationLog.State.FAILED
+
+    return result["state"]
+
+
+class BackgroundSync:
+    """Enqueue syndication of packages in chunks.
+
+    Instead of a job per package, every job carries up to `batch_size` package
+    IDs for a single profile. `results` counts queued packages as
+    `(profile ID, "queued")` pairs.
+
+    Example:
+        with BackgroundSync() as queue:
+            for package_id, profile in tasks:
+                queue.submit(package_id, profile)
+
+    """
+
+    def __init__(self, batch_size: int | None = None, force: bool = False):
+        self.batch_size = batch_size or config.get_batch_size()
+        self.force = force
+        self.results: Counter[tuple[str, str]] = Counter()
+
+        self._chunks: dict[str, tuple[Profile, list[str]]] = {}
+
+    def __enter__(self) -> BackgroundSync:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.join()
+
+    def submit(self, package_id: str, profile: Profile, topic: Topic = Topic.update) -> None:
+        """Add package to the chunk of the profile, enqueue the full chunk."""
+        _, ids = self._chunks.setdefault(profile.id, (profile, []))
+        ids.append(package_id)
+        self.results[(profile.id, "queued")] += 1
+
+        if len(ids) >= self.batch_size:
+            self._enqueue(profile.id)
+
+    def wait(self) -> None:
+        """Enqueue all incomplete chunks."""
+        for profile_id in list(self._chunks):
+            self._enqueue(profile_id)
+
+    join = wait
+
+    def _enqueue(self, profile_id: str) -> None:
+        profile, ids = self._chunks.pop(profile_id)
+        tk.enqueue_job(
+            sync_batch,
+            [ids, profile.id, registry.profiles.version(profile.id)],
+            {"force": self.force},
+            title=f"Syndicate {len(ids)} packages to {profile.id}",
+            queue=profile.queue,
+            # every package gets the time of a standalone syndication job
+            rq_kwargs={"timeout": config.get_job_timeout() * len(ids)},
+        )
+
+
+def sync_batch(
+    package_ids: list[str],
+    profile_id: str,
+    profile_version: str | None = None,
+    force: bool = False,
+) -> dict[str, int]:
+    """Background job that syndicates a chunk of packages to the profile.
+
+    Packages are syndicated one after another using the same database session
+    and HTTP client. Syndication logs are read by a single statement for the
+    whole chunk and written in bulk. Logs of packages that got a new remote
+    copy are written immediately.
+    """
+    results: Counter[str] = Counter()
+    if not registry.resolve_job_profile(profile_id, profile_version):
+        return dict(results)
+
+    with SyndicationLog.preload(package_ids), LogBuffer(len(package_ids)) as buffer:
+        for package_id in package_ids:
+            log.info("Sync package %s to the %s", package_id, profile_id)
+            try:
+                result = tk.get_action("syndicate_sync")(
+                    {"ignore_auth": True, "syndication_log": buffer},  # type: ignore
+                    {"id": package_id, "topic": Topic.update.name, "profile": profile_id, "force": force},
+                )
+            except Exception:  # noqa: BLE001
+                log.exception("Syndication of %s to profile %s failed", package_id, profile_id)
+                model.Session.rollback()
+                results[SyndicationLog.State.FAILED] += 1
+                continue
+
+            results[result["state"]] += 1
+    log.info("Chunk of %s packages syndicated to %s: %s", len(package_ids), profile_id, dict(results))
+
+    return dict(results)
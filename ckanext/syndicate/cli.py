@@ -8,8 +8,8 @@ import click
 import ckan.plugins.toolkit as tk
 from ckan import model
 
-from ckanext.syndicate import utils
-from ckanext.syndicate.types import Topic
+from ckanext.syndicate import bulk, config, engine, runs, utils
+from ckanext.syndicate.model import SyndicationRun
 
 __all__ = [
     "syndicate",
@@ -25,27 +25,87 @@ def syndicate():
 @click.argument("id", required=False)
 @click.option("-t", "--timeout", type=float, default=0)
 @click.option("-f", "--foreground", is_flag=True)
+@click.option("--force", is_flag=True, help="Push packages even if they did not change since the last syndication")
+@click.option("--since", is_flag=True, help="Only packages modified after their last syndication")
+@click.option("--resume", "run_id", help="Continue interrupted run")
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of concurrent syndications per profile in foreground mode",
+)
 @click.pass_context
-def sync(ctx: click.Context, id: str, timeout: float, foreground: bool) -> None:
-    """Syndicate datasets for all profiles."""
+def sync(  # noqa: PLR0913 PLR0917
+    ctx: click.Context,
+    id: str,
+    timeout: float,
+    foreground: bool,
+    force: bool,
+    since: bool,
+    run_id: str | None,
+    workers: int,
+) -> None:
+    """Syndicate datasets for all profiles.
+
+    Progress of the run is recorded after every chunk of
+    `ckanext.syndicate.batch_size` packages. Interrupted run can be continued
+    using `--resume` with the ID of the run.
+    """
     packages = model.Session.query(model.Package)
     if id:
         packages = packages.filter((model.Package.id == id) | (model.Package.name == id))
 
-    total = packages.count()
+    profiles = utils.get_profiles()
+
+    try:
+        run = runs.BulkRun.resume(run_id) if run_id else runs.BulkRun.start(profiles)
+    except (tk.ObjectNotFound, tk.ValidationError) as e:
+        tk.error_shout(e)
+        raise click.Abort from e
+
+    profiles = [p for p in profiles if p.id in run.records]
+    click.secho(f"Syndication run: {run.id}", bold=True)
+
+    checked = not utils.is_default_skip_policy()
+    if since or not checked:
+        selections = [([profile], utils.profile_packages(profile, packages, since)) for profile in profiles]
+    else:
+        selections = [(profiles, packages)]
 
     with ctx.meta["flask_app"].test_request_context():
         tk.g.syndication = True
-        with click.progressbar(packages, length=total) as bar:
-            for package in bar:
-                bar.label = f"Sending syndication signal to package {package.id}"
-                for profile in utils.profiles_for(package):
-                    if foreground:
-                        utils.sync_package(package.id, Topic.update, profile)
-                    else:
-                        utils.syndicate_dataset(package.id, Topic.update, profile)
-
-                time.sleep(timeout)
+        replicated = set()
+        pool = bulk.ForegroundSync(workers, force) if foreground else bulk.BackgroundSync(force=force)
+        try:
+            with pool, utils.cached_skip_decisions():
+                for allowed, selection in selections:
+                    total = selection.count()
+                    run.estimate(total, allowed)
+                    with click.progressbar(length=total) as bar:
+                        for chunk in run.chunks(selection, allowed, config.get_batch_size()):
+                            for package in chunk:
+                                bar.label = f"Sending syndication signal to package {package.id}"
+                                targets = utils.profiles_for(package) if checked else allowed
+                                for profile in targets:
+                                    if profile not in allowed or not run.includes(profile, package.id):
+                                        continue
+
+                                    utils.replicate_organization_once(package.owner_org, profile, replicated)
+                                    pool.submit(package.id, profile)
+
+                                time.sleep(timeout)
+
+                            pool.wait()
+                            run.checkpoint(chunk, allowed)
+                            bar.update(len(chunk))
+
+                    run.finish(allowed)
+        except BaseException:
+            run.fail()
+            raise
+
+    _print_results(pool.results)
 
 
 @syndicate.command()
@@ -57,14 +117,15 @@ def check(ids: tuple[str]) -> None:
         q = q.filter(model.Package.id.in_(ids) | model.Package.name.in_(ids))
 
     counter = Counter()
-    for pkg in q:
-        profiles = utils.profiles_for(pkg)
-        names = [p.id for p in profiles]
-        if not names:
-            continue
+    with utils.cached_skip_decisions():
+        for pkg in utils.iter_packages(q):
+            profiles = utils.profiles_for(pkg)
+            names = [p.id for p in profiles]
+            if not names:
+                continue
 
-        counter.update(names)
-        click.echo("{}: {}".format(pkg.id, ", ".join(names)))
+            counter.update(names)
+            click.echo("{}: {}".format(pkg.id, ", ".join(names)))
 
     if not counter:
         return
@@ -77,7 +138,87 @@ def check(ids: tuple[str]) -> None:
 @syndicate.command()
 @click.argument("profile_id", required=True)
 @click.option("-f", "--foreground", is_flag=True)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of concurrent syndications in foreground mode",
+)
+@click.option("--since", is_flag=True, help="Only packages modified after their last syndication")
 @click.pass_context
-def sync_profile(ctx: click.Context, profile_id: str, foreground: bool) -> None:
+def sync_profile(ctx: click.Context, profile_id: str, foreground: bool, workers: int, since: bool) -> None:
     """Syndicate datasets for a specific profile."""
-    utils.sync_profile(profile_id, foreground=foreground)
+    with ctx.meta["flask_app"].test_request_context():
+        results = utils.sync_profile(profile_id, foreground=foreground, workers=workers, since=since)
+
+    _print_results(results)
+
+
+@syndicate.command("engine")
+@click.option("-p", "--profile", "profile_ids", multiple=True, help="Limit syndication to the given profiles")
+@click.option(
+    "-s",
+    "--sessions",
+    type=click.IntRange(min=1),
+    default=10,
+    help="Number of simultaneous syndications, each using its own database connection",
+)
+@click.option("--force", is_flag=True, help="Push packages even if they did not change since the last syndication")
+@click.option("--since", is_flag=True, help="Only packages modified after their last syndication")
+@click.option("--job", is_flag=True, help="Run the engine inside a single background job")
+@click.pass_context
+def run_engine(  # noqa: PLR0913 PLR0917
+    ctx: click.Context,
+    profile_ids: tuple[str],
+    sessions: int,
+    force: bool,
+    since: bool,
+    job: bool,
+) -> None:
+    """Syndicate datasets to all profiles at once from a single process."""
+    if job:
+        tk.enqueue_job(
+            engine.run_engine,
+            [list(profile_ids), sessions, force, since],
+            title="Syndication engine",
+            rq_kwargs={"timeout": -1},
+        )
+        click.secho("Syndication engine job has been queued", fg="green")
+        return
+
+    with ctx.meta["flask_app"].test_request_context():
+        results = engine.syndicate_all(profile_ids, sessions, force, since)
+
+    _print_results(results)
+
+
+@syndicate.command()
+def retry() -> None:
+    """Enqueue syndications that failed with transient errors.
+
+    Run it periodically, e.g. via cron.
+    """
+    results = utils.retry_failed()
+    for profile, count in sorted(results.items()):
+        click.secho(f"{profile}: {count} syndications queued for retry")
+
+
+@syndicate.command("runs")
+@click.option("-n", "--limit", type=click.IntRange(min=1), default=20, help="Number of runs to show")
+def list_runs(limit: int) -> None:
+    """Show progress of recent bulk syndication runs."""
+    for record in SyndicationRun.latest(limit):
+        progress = f"{record.processed}/{record.total}"
+        throughput = f"{record.throughput:.2f}/s" if record.throughput else "-"
+        eta = record.eta.isoformat(timespec="seconds") if record.eta else "-"
+        click.echo(f"{record.id}\t{record.profile_id}\t{record.state}\t{progress}\t{throughput}\tETA: {eta}")
+
+
+def _print_results(results: Counter[tuple[str, str]]) -> None:
+    if not results:
+        return
+
+    click.secho("Results:", bold=True)
+    for (profile, state), count in sorted(results.items()):
+        click.secho(f"\t{profile}: {state}: {count}")
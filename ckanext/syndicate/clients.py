@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING
+
+import ckanapi
+import requests
+from requests.adapters import HTTPAdapter
+
+from ckanext.syndicate.retry import raise_for_transient_status
+from ckanext.syndicate.throttle import RateLimiter, ThrottledSession
+
+if TYPE_CHECKING:
+    from ckanext.syndicate.types import Profile
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_clients: dict[tuple[str, ...], ckanapi.RemoteCKAN] = {}
+
+
+def get_client(profile: Profile) -> ckanapi.RemoteCKAN:
+    """Return a pooled API client for the profile.
+
+    Clients are cached per process and share a keep-alive `requests.Session`,
+    so consecutive syndications to the same portal reuse already established
+    TCP/TLS connections. Any change of the connection settings of the profile
+    produces a new client.
+    """
+    key = _client_key(profile)
+
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            log.debug("Create HTTP client for profile %s", profile.id)
+            client = ckanapi.RemoteCKAN(
+                profile.ckan_url,
+                apikey=profile.api_key,
+                user_agent=profile.user_agent,
+                session=make_session(profile),
+            )
+            _clients[key] = client
+
+    return client
+
+
+def make_session(profile: Profile) -> requests.Session:
+    """Create HTTP session with connection pool sized for the profile.
+
+    Throttling and server errors of the remote portal are raised as
+    `requests.HTTPError`, so they can be told apart from errors reported by
+    CKAN API. Profiles with `rate_limit` get a session that shares the adaptive limit
+    with every other process that syndicates to the same profile.
+    """
+    session = ThrottledSession(RateLimiter(profile)) if profile.rate_limit > 0 else requests.Session()
+    session.hooks["response"].append(raise_for_transient_status)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=profile.pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def reset_clients() -> None:
+    """Close and forget all pooled clients."""
+    with _lock:
+        for client in _clients.values():
+            client.session.close()
+        _clients.clear()
+
+
+def _client_key(profile: Profile) -> tuple[str, ...]:
+    return (
+        profile.id,
+        profile.ckan_url,
+        profile.api_key,
+        profile.user_agent or "",
+        str(profile.pool_size),
+        str(profile.rate_limit),
+        str(profile.rate_limit_burst),
+        str(profile.rate_limit_min),
+    )
+
+
+def _forget_inherited_clients() -> None:
+    # sockets must never be shared between processes. RQ forks a work-horse
+    # for every job, so the child starts with an empty registry and the
+    # parent's connections stay untouched.
+    global _lock  # noqa: PLW0603
+    _lock = threading.Lock()
+    _clients.clear()
+
+
+os.register_at_fork(after_in_child=_forget_inherited_clients)
@@ -2,6 +2,16 @@ import ckan.plugins.toolkit as tk
 
 CONFIG_SYNC_ON_CHANGES = "ckanext.syndicate.sync_on_changes"
 CONFIG_SYNC_ON_MEMBER_CHANGES = "ckanext.syndicate.sync_on_member_changes"
+CONFIG_GROUP_CACHE_TTL = "ckanext.syndicate.group_cache_ttl"
+CONFIG_IMAGE_CACHE_PATH = "ckanext.syndicate.image_cache_path"
+CONFIG_DEBOUNCE = "ckanext.syndicate.debounce"
+CONFIG_BATCH_SIZE = "ckanext.syndicate.batch_size"
+CONFIG_LOG_UNSYNDICATED = "ckanext.syndicate.log_unsyndicated"
+CONFIG_PROFILE_RELOAD_INTERVAL = "ckanext.syndicate.profile_reload_interval"
+CONFIG_DROP_STALE_JOBS = "ckanext.syndicate.drop_stale_jobs"
+CONFIG_DEFERRED_CHANGES = "ckanext.syndicate.deferred_changes"
+CONFIG_QUEUE_NAME = "ckanext.syndicate.queue.name"
+CONFIG_JOB_TIMEOUT = "ckan.jobs.timeout"
 
 
 def get_sync_on_changes() -> bool:
@@ -10,3 +20,43 @@ def get_sync_on_changes() -> bool:
 
 def get_sync_on_member_changes() -> bool:
     return tk.asbool(tk.config[CONFIG_SYNC_ON_MEMBER_CHANGES])
+
+
+def get_group_cache_ttl() -> int:
+    return tk.asint(tk.config[CONFIG_GROUP_CACHE_TTL])
+
+
+def get_image_cache_path() -> str:
+    return tk.config[CONFIG_IMAGE_CACHE_PATH]
+
+
+def get_debounce() -> int:
+    return tk.asint(tk.config[CONFIG_DEBOUNCE])
+
+
+def get_batch_size() -> int:
+    return tk.asint(tk.config[CONFIG_BATCH_SIZE])
+
+
+def get_log_unsyndicated() -> bool:
+    return tk.asbool(tk.config[CONFIG_LOG_UNSYNDICATED])
+
+
+def get_profile_reload_interval() -> int:
+    return tk.asint(tk.config[CONFIG_PROFILE_RELOAD_INTERVAL])
+
+
+def get_drop_stale_jobs() -> bool:
+    return tk.asbool(tk.config[CONFIG_DROP_STALE_JOBS])
+
+
+def get_deferred_changes() -> bool:
+    return tk.asbool(tk.config[CONFIG_DEFERRED_CHANGES])
+
+
+def get_queue_name() -> str:
+    return tk.config[CONFIG_QUEUE_NAME]
+
+
+def get_job_timeout() -> int:
+    return tk.asint(tk.config[CONFIG_JOB_TIMEOUT])
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from ckanext.syndicate import bulk, config, utils
+from ckanext.syndicate.model import LogBuffer
+from ckanext.syndicate.types import Profile
+
+log = logging.getLogger(__name__)
+
+
+class SyndicationEngine:
+    """Syndicate packages to multiple portals from a single event loop.
+
+    Packages of every profile are selected by `utils.profile_packages` and
+    streamed in chunks by `utils.package_chunks`, so all profiles progress at
+    the same time. Each profile has its own limit of in-flight syndications,
+    so a slow remote portal never holds back syndication to other portals.
+
+    Syndication reads the local package and writes the syndication log, so
+    every in-flight syndication needs a database session. Blocking work runs
+    in a pool of `sessions` threads plus one thread that selects packages. The
+    process never uses more than `sessions + 1` database connections,
+    regardless of the number of profiles.
+
+    Example:
+        engine = SyndicationEngine(sessions=20)
+        results = engine.run(utils.get_profiles())
+
+    """
+
+    def __init__(self, sessions: int = 10, force: bool = False, since: bool = False):
+        self.sessions = sessions
+        self.force = force
+        self.since = since
+        self.results: Counter[tuple[str, str]] = Counter()
+
+        self._app = current_app._get_current_object()  # type: ignore
+        self._log = LogBuffer(config.get_batch_size())
+
+    def run(self, profiles: Iterable[Profile]) -> Counter[tuple[str, str]]:
+        """Syndicate packages to the profiles and return outcomes.
+
+        Outcomes are counted as `(profile ID, state)` pairs.
+        """
+        profiles = list(profiles)
+        if profiles:
+            asyncio.run(self._syndicate(profiles))
+
+        return self.results
+
+    async def _syndicate(self, profiles: list[Profile]) -> None:
+        # sessions are shared fairly, but every profile gets at least one
+        in_flight = max(1, self.sessions // len(profiles))
+        replicated: set[tuple[str, str]] = set()
+
+        with (
+            ThreadPoolExecutor(1, thread_name_prefix="syndicate-select") as selector,
+            ThreadPoolExecutor(self.sessions, thread_name_prefix="syndicate") as workers,
+        ):
+            await asyncio.gather(
+                *(self._syndicate_profile(profile, in_flight, replicated, selector, workers) for profile in profiles)
+            )
+            await asyncio.get_running_loop().run_in_executor(workers, bulk.isolated, self._app, self._log.flush)
+
+    async def _syndicate_profile(
+        self,
+        profile: Profile,
+        in_flight: int,
+        replicated: set[tuple[str, str]],
+        selector: ThreadPoolExecutor,
+        workers: ThreadPoolExecutor,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(in_flight)
+        tasks: set[asyncio.Task[None]] = set()
+        after = None
+
+        while True:
+            ids, after = await loop.run_in_executor(
+                selector, bulk.isolated, self._app, self._select, profile, after, replicated
+            )
+            for package_id in ids:
+                await slots.acquire()
+                task = asyncio.create_task(self._push(package_id, profile, slots, workers))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if after is None:
+                break
+
+        await asyncio.gather(*tasks)
+
+    def _select(
+        self,
+        profile: Profile,
+        after: str | None,
+        replicated: set[tuple[str, str]],
+    ) -> tuple[list[str], str | None]:
+        """Select the next chunk of packages for the profile.
+
+        Returns IDs of applicable packages and the ID of the last checked
+        package, that is `None` when all packages are selected.
+        """
+        packages = utils.profile_packages(profile, since=self.since)
+        chunk = next(utils.package_chunks(packages, after=after), [])
+        if not chunk:
+            return [], None
+
+        checked = not utils.is_default_skip_policy()
+        ids = []
+        for package in chunk:
+            if checked and profile not in utils.profiles_for(package):
+                continue
+
+            utils.replicate_organization_once(package.owner_org, profile, replicated)
+            ids.append(package.id)
+
+        return ids, chunk[-1].id
+
+    async def _push(
+        self,
+        package_id: str,
+        profile: Profile,
+        slots: asyncio.Semaphore,
+        workers: ThreadPoolExecutor,
+    ) -> None:
+        try:
+            state = await asyncio.get_running_loop().run_in_executor(
+                workers, bulk.isolated, self._app, self._call, package_id, profile
+            )
+            self.results[(profile.id, state)] += 1
+        finally:
+            slots.release()
+
+    def _call(self, package_id: str, profile: Profile) -> str:
+        return bulk.sync_logged(package_id, profile, self._log, force=self.force)
+
+
+def syndicate_all(
+    profile_ids: Iterable[str] = (),
+    sessions: int = 10,
+    force: bool = False,
+    since: bool = False,
+) -> Counter[tuple[str, str]]:
+    """Syndicate all packages to the given (or all) profiles using the engine."""
+    profile_ids = set(profile_ids)
+    profiles = [p for p in utils.get_profiles() if not profile_ids or p.id in profile_ids]
+
+    return SyndicationEngine(sessions, force, since).run(profiles)
+
+
+def run_engine(
+    profile_ids: list[str],
+    sessions: int = 10,
+    force: bool = False,
+    since: bool = False,
+) -> dict[str, int]:
+    """Background job that syndicates all packages using the engine."""
+    results = syndicate_all(profile_ids, sessions, force, since)
+    log.info("Syndication engine finished: %s", dict(results))
+
+    return {f"{profile}:{state}": count for (profile, state), count in results.items()}
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+from urllib.parse import urlparse
+
+import requests
+
+import ckan.plugins.toolkit as tk
+
+from ckanext.syndicate import config
+
+log = logging.getLogger(__name__)
+DEFAULT_IMAGE_URL = "https://www.gravatar.com/avatar/123?s=400&d=identicon"
+TIMEOUT = 2
+
+
+class CachedImage(io.BytesIO):
+    """Image content together with its SHA256 digest.
+
+    Can be passed directly as a file upload to the remote portal.
+    """
+
+    def __init__(self, content: bytes, digest: str, name: str):
+        super().__init__(content)
+        self.digest = digest
+        self.name = name
+
+
+def fetch(url: str) -> CachedImage:
+    """Download image, using the local copy if it did not change.
+
+    Images are stored by the hash of their content. For every URL, cache keeps
+    `ETag`/`Last-Modified` headers of the last response and revalidates the
+    local copy using conditional request.
+    """
+    entry = _read_entry(url)
+    headers = {}
+    if entry and os.path.exists(_blob_path(entry["digest"])):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    resp = requests.get(url, headers=headers, timeout=TIMEOUT)
+
+    if entry and headers and resp.status_code == requests.codes.not_modified:
+        with open(_blob_path(entry["digest"]), "rb") as src:
+            return CachedImage(src.read(), entry["digest"], _filename(url))
+
+    resp.raise_for_status()
+
+    content = resp.content
+    digest = hashlib.sha256(content).hexdigest()
+    blob = _blob_path(digest)
+    if not os.path.exists(blob):
+        _write_atomic(blob, content)
+
+    _write_entry(
+        url,
+        {
+            "digest": digest,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+        },
+    )
+
+    return CachedImage(content, digest, _filename(url))
+
+
+def _storage_path() -> str:
+    path = config.get_image_cache_path()
+    if not path:
+        root = tk.config.get("ckan.storage_path") or tempfile.gettempdir()
+        path = os.path.join(root, "syndicate", "images")
+
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _blob_path(digest: str) -> str:
+    return os.path.join(_storage_path(), digest)
+
+
+def _entry_path(url: str) -> str:
+    return os.path.join(_storage_path(), hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+
+def _read_entry(url: str) -> dict[str, str | None] | None:
+    try:
+        with open(_entry_path(url)) as src:
+            return json.load(src)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_entry(url: str, entry: dict[str, str | None]) -> None:
+    _write_atomic(_entry_path(url), json.dumps(entry).encode())
+
+
+def _write_atomic(path: str, content: bytes) -> None:
+    # multiple workers may cache the same image simultaneously
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as dest:
+        dest.write(content)
+    os.replace(tmp, path)
+
+
+def _filename(url: str) -> str:
+    return os.path.basename(urlparse(url).path) or "image"
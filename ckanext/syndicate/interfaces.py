@@ -17,6 +17,9 @@ class ISyndicate(Interface):
     def skip_syndication(self, package: model.Package, profile: Profile) -> bool | str:
         """Decide whether a package must NOT be syndicated.
 
+        Every implementation is consulted and the package is skipped if any
+        of them skips it.
+
         Return `True` or non-empty string if package does not need
         syndication. Keep in mind, that non-syndicated package remains the same
         on the remote side. If package was removed locally, it's better not to
@@ -24,19 +27,28 @@ class ISyndicate(Interface):
 
         Returned string will be printed in application logs and may clarify
         reasons behind syndication flow. Prefer returning string instead of uninformative `True`
+
+        Bulk commands pass `utils.PackageStub` instead of the package model.
+        Its `extras` contain all extras of the package. Other attributes are
+        available, but require loading of the whole package.
+
+        Bulk commands compile the default implementation into SQL, see
+        `utils.candidate_packages`. Keep both in sync when these rules change.
         """
         if package.private:
             return "package is private"
 
         if package.state == "deleted":
-            if SyndicationLog.get(package.id, profile.id) is None:
+            record = SyndicationLog.get(package.id, profile.id)
+            # skipped packages are recorded without remote ID
+            if record is None or record.target_id == "-":
                 return "deleted package was never syndicated"
             return False
 
         if not tk.asbool(package.extras.get(profile.flag, "false")):
             return "syndication flag disabled on package"
 
-        return False
+        return _filtered_out(package, profile) or False
 
     def prepare_package_for_syndication(
         self, package_id: str, data_dict: dict[str, Any], profile: Profile
@@ -53,3 +65,19 @@ class ISyndicate(Interface):
         Remove all the sensitive fields, normalize group/organization type, etc.
         """
         return group
+
+
+def _filtered_out(package: model.Package, profile: Profile) -> str | None:
+    """Apply `filter_*` options of the profile to the package."""
+    if profile.filter_organizations:
+        org = model.Group.get(package.owner_org) if package.owner_org else None
+        if not org or not {org.id, org.name} & set(profile.filter_organizations):
+            return "package does not belong to selected organizations"
+
+    if profile.filter_types and package.type not in profile.filter_types:
+        return "package type is not selected"
+
+    if profile.filter_tags and not {tag.name for tag in package.get_tags()} & set(profile.filter_tags):
+        return "package has no selected tags"
+
+    return None
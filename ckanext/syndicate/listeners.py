@@ -3,8 +3,6 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-from ckan import model
-
 from ckanext.syndicate import config, utils
 from ckanext.syndicate.types import Topic
 
@@ -23,17 +21,9 @@ def package_modification(sender: str, **kwargs: Any) -> None:
     data_dict: dict[str, Any] = kwargs["data_dict"]
     # package_delete does not return any result
     id = result["id"] if result else data_dict["id"]
-    package = model.Package.get(id)
-    if not package:
-        return
 
     topic = Topic.create if sender == "package_create" else Topic.update
-
-    for profile in utils.profiles_for(package):
-        log.debug("Syndicate on change triggered for <%s> to %s", package.id, profile.ckan_url)
-        utils.syndicate_dataset(package.id, topic, profile)
-
-    model.Session.commit()
+    _on_change(id, topic)
 
 
 def member_modification(sender: str, **kwargs: Any) -> None:
@@ -50,14 +40,14 @@ def member_modification(sender: str, **kwargs: Any) -> None:
         return
     id = data_dict["object"]
 
-    package = model.Package.get(id)
-    if not package:
-        return
+    _on_change(id, Topic.update)
 
-    topic = Topic.update
 
-    for profile in utils.profiles_for(package):
-        log.debug("Syndicate on member change triggered for <%s> to %s", package.id, profile.ckan_url)
-        utils.syndicate_dataset(package.id, topic, profile)
+def _on_change(package_id: str, topic: Topic) -> None:
+    # keep the request of the user fast: skip rules and database writes are
+    # handled by the background job
+    if config.get_deferred_changes():
+        utils.enqueue_package_change(package_id, topic)
+        return
 
-    model.Session.commit()
+    utils.syndicate_package_change(package_id, topic)
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import copy
+import json
 import logging
 import uuid
+from datetime import datetime as dt
+from datetime import timedelta as td
+from datetime import timezone as tz
 from typing import Any
 
 import ckanapi
@@ -9,17 +14,21 @@ import requests
 from typing_extensions import TypedDict
 
 import ckan.plugins.toolkit as tk
+from ckan import model
 from ckan import plugins as p
 from ckan import types as ckan_types
 from ckan.logic import validate
 
-from ckanext.syndicate import signals, types
+from ckanext.syndicate import images, retry, signals, types, utils
 from ckanext.syndicate.interfaces import ISyndicate
 from ckanext.syndicate.logic import schema
-from ckanext.syndicate.model import SyndicationLog
+from ckanext.syndicate.model import LogBuffer, SyndicationGroupMap, SyndicationLog
 
 log = logging.getLogger(__name__)
 REMOTE_NAME_MAX_LENGTH = 100
+SYNC_METHOD_UPDATE = "update"
+SYNC_METHOD_PATCH = "patch"
+SYNC_METHOD_REVISE = "revise"
 GROUP_EXCLUDE_FIELDS = [
     "is_organization",
     "num_followers",
@@ -30,12 +39,14 @@ GROUP_EXCLUDE_FIELDS = [
     "groups",
     "extras",
 ]
+_UP_TO_DATE_STATES = (SyndicationLog.State.SYNCED, SyndicationLog.State.UNCHANGED)
 
 
 class SyncData(TypedDict):
     id: str
     topic: types.Topic
     profile: types.Profile
+    force: bool
 
 
 class SyncResult(TypedDict):
@@ -45,12 +56,44 @@ class SyncResult(TypedDict):
     error: str | None
 
 
+class SyncOutcome(TypedDict):
+    remote: dict[str, Any]
+    state: str
+    payload_hash: str
+    payload: dict[str, Any] | None
+    resources: dict[str, dict[str, str]] | None
+    # remote portal received and accepted at least one request
+    contacted: bool
+
+
 @validate(schema.syndicate_sync)  # type: ignore
 def syndicate_sync(context: ckan_types.Context, data_dict: SyncData) -> SyncResult:
+    """Syndicate the package to the remote portal.
+
+    Remote package is not touched if the prepared payload did not change since
+    the last successful syndication. Pass `force` to push it anyway.
+
+    With `defer_commit` in the context, the syndication log is not committed.
+    `syndication_log` context item, that holds `LogBuffer`, collects log
+    entries for the bulk write instead.
+
+    Transient failures(timeouts, connection errors, 429 and 5xx responses) are
+    scheduled for retry with exponential backoff. Consecutive transient
+    failures open the circuit of the profile and following syndications fail
+    without contacting the remote portal until the circuit closes.
+    """
     tk.check_access("syndicate_sync", context, data_dict)  # type: ignore
 
+    # log entry is used by several steps of syndication. Read it once.
+    with SyndicationLog.preload([data_dict["id"]]):
+        return _syndicate_sync(context, data_dict)
+
+
+def _syndicate_sync(context: ckan_types.Context, data_dict: SyncData) -> SyncResult:
     local_id = data_dict["id"]
-    profile_id = data_dict["profile"].id
+    profile = data_dict["profile"]
+    profile_id = profile.id
+    breaker = retry.CircuitBreaker(profile)
     sync_result = SyncResult(
         local_id=local_id,
         target_id="",
@@ -59,17 +102,25 @@ def syndicate_sync(context: ckan_types.Context, data_dict: SyncData) -> SyncResu
     )
 
     try:
-        result = _syndicate_sync_internal(context, data_dict)
+        breaker.check()
+        outcome = _sync_with_fresh_organization(context, data_dict)
     except Exception as e:  # noqa: BLE001
-        log.exception("Syndication failed for package %s to profile %s", local_id, profile_id)
+        if isinstance(e, retry.CircuitOpenError):
+            log.warning("Syndication of package %s postponed: %s", local_id, e)
+        else:
+            log.exception("Syndication failed for package %s to profile %s", local_id, profile_id)
 
         error_msg = str(e)
+        attempts, retry_at = _schedule_retry(e, local_id, profile, breaker)
 
-        SyndicationLog.write(
+        _write_log(
+            context,
             local_id=local_id,
             profile_id=profile_id,
             state=SyndicationLog.State.FAILED,
             error=error_msg,
+            attempts=attempts,
+            retry_at=retry_at,
         )
 
         sync_result["error"] = error_msg
@@ -77,58 +128,397 @@ def syndicate_sync(context: ckan_types.Context, data_dict: SyncData) -> SyncResu
 
         return sync_result
 
-    SyndicationLog.write(local_id=local_id, target_id=result["id"], profile_id=profile_id)
+    if outcome["contacted"]:
+        breaker.record_success()
 
-    sync_result["target_id"] = result["id"]
+    target_id = outcome["remote"]["id"]
+    _write_log(
+        context,
+        local_id=local_id,
+        target_id=target_id,
+        profile_id=profile_id,
+        state=outcome["state"],
+        payload_hash=outcome["payload_hash"],
+        target_name=outcome["remote"].get("name"),
+        payload=outcome["payload"],
+        resources=outcome["resources"],
+    )
+
+    sync_result["target_id"] = target_id
+    sync_result["state"] = outcome["state"]
 
     return sync_result
 
 
-def _syndicate_sync_internal(context: ckan_types.Context, data_dict: SyncData) -> dict[str, Any]:
-    tk.check_access("syndicate_sync", context, data_dict)  # type: ignore
+def _sync_with_fresh_organization(context: ckan_types.Context, data_dict: SyncData) -> SyncOutcome:
+    """Syndicate package, replicating its organization again if necessary.
 
-    details = tk.get_action("syndicate_prepare")(
-        context,
-        {
-            "id": data_dict["id"],
-            "topic": data_dict["topic"].name,
-            "profile": data_dict["profile"].id,
-        },
-    )
-    ckan = data_dict["profile"].get_target()
+    Recorded ID of the remote organization becomes invalid when organization
+    is removed from the remote portal. In this case the remote portal rejects
+    `owner_org` of the package, mapping of the organization is dropped and
+    syndication is repeated with the new copy of the organization.
+    """
+    try:
+        return _syndicate_sync_internal(context, data_dict)
+    except ckanapi.ValidationError as e:
+        profile = data_dict["profile"]
+        package = model.Package.get(data_dict["id"])
+        if (
+            "owner_org" not in e.error_dict
+            or not (profile.replicate_organization or profile.update_organization)
+            or not package
+            or not package.owner_org
+        ):
+            raise
+
+        log.warning("Organization %s was rejected by %s, replicating it again", package.owner_org, profile.id)
+        utils.forget_remote_group(package.owner_org, profile)
+
+    return _syndicate_sync_internal(context, data_dict)
+
+
+def _write_log(context: ckan_types.Context, **values: Any) -> None:
+    buffer: LogBuffer | None = context.get("syndication_log")  # type: ignore
+    if buffer is None:
+        SyndicationLog.write(**values, defer_commit=context.get("defer_commit", False))
+        return
+
+    new_target = _is_new_target(values)
+    buffer.add(**values)
+    if new_target:
+        # if the job is killed before the buffer is flushed, the next
+        # syndication must not create the remote package again
+        buffer.flush()
+
+
+def _is_new_target(values: dict[str, Any]) -> bool:
+    target_id = values.get("target_id")
+    if not target_id or target_id == "-":
+        return False
+
+    record = SyndicationLog.get(values["local_id"], values["profile_id"])
+    return record is None or record.target_id != target_id
+
+
+def _schedule_retry(
+    error: Exception,
+    local_id: str,
+    profile: types.Profile,
+    breaker: retry.CircuitBreaker,
+) -> tuple[int, dt | None]:
+    """Compute number of failed attempts and time of the next attempt."""
+    if not retry.is_transient(error):
+        return 0, None
 
-    signals.before_syndication.send(data_dict["id"], profile=data_dict["profile"], details=details)
+    record = SyndicationLog.get(local_id, profile.id)
+    attempts = record.attempts if record else 0
 
-    result = None
+    if isinstance(error, retry.CircuitOpenError):
+        # remote portal was not contacted, so the attempt is not counted
+        delay = error.delay + retry.backoff_delay(profile, 1)
+        return attempts, dt.now(tz=tz.utc) + td(seconds=delay)
+
+    breaker.record_failure()
+    attempts += 1
+
+    if attempts > profile.max_retries:
+        log.error("Give up syndication of package %s to profile %s after %s attempts", local_id, profile.id, attempts)
+        return attempts, None
+
+    return attempts, dt.now(tz=tz.utc) + td(seconds=retry.backoff_delay(profile, attempts))
+
+
+def _syndicate_sync_internal(context: ckan_types.Context, data_dict: SyncData) -> SyncOutcome:
+    tk.check_access("syndicate_sync", context, data_dict)  # type: ignore
+
+    profile = data_dict["profile"]
+    details = _prepare_details(context, data_dict["id"], data_dict["topic"], profile)
     topic = types.Topic[details["topic"]]
+    digest = utils.payload_hash(details["prepared"])
+    record = SyndicationLog.get(details["package"]["id"], profile.id)
+
+    if (
+        topic is types.Topic.update
+        and not data_dict["force"]
+        and record
+        and record.payload_hash == digest
+        and record.state in _UP_TO_DATE_STATES
+    ):
+        log.debug("Package %s is unchanged since last syndication to %s", data_dict["id"], profile.id)
+        return SyncOutcome(
+            remote={"id": record.target_id, "name": record.target_name},
+            state=SyndicationLog.State.UNCHANGED,
+            payload_hash=digest,
+            payload=None,
+            resources=None,
+            contacted=False,
+        )
+
+    ckan = profile.get_target()
+
+    signals.before_syndication.send(data_dict["id"], profile=profile, details=details)
+
+    payload = details["prepared"]
+    previous_resources = None
+    if profile.sync_resources and topic is types.Topic.update and record and _resource_pairs(details) is not None:
+        previous_resources = record.resources
+
+    if previous_resources:
+        # resources are synchronized one by one after the package itself
+        payload = {k: v for k, v in payload.items() if k != "resources"}
 
+    contacted = True
     if topic is types.Topic.create:
-        result = ckan.action.package_create(**details["prepared"])
+        if _is_deleted(details):
+            return _deleted_outcome(data_dict["id"], profile, digest)
+        result = ckan.action.package_create(**payload)
     else:
-        result = ckan.action.package_update(**details["prepared"])
+        try:
+            result, contacted = _update_remote_package(ckan, payload, profile, record, data_dict["force"])
+        except ckanapi.NotFound:
+            if _is_deleted(details):
+                return _deleted_outcome(data_dict["id"], profile, digest)
+
+            log.warning(
+                "Remote package %s not found on %s, creating new one",
+                payload["id"],
+                profile.id,
+            )
+            details = _prepare_details(context, data_dict["id"], types.Topic.create, profile)
+            digest = utils.payload_hash(details["prepared"])
+            payload = details["prepared"]
+            previous_resources = None
+            result = ckan.action.package_create(**payload)
+
+    resource_map = None
+    if profile.sync_resources:
+        resource_map = _sync_resources(ckan, result, _resource_pairs(details), previous_resources)
+        contacted = contacted or resource_map != previous_resources
+
+    signals.after_syndication.send(data_dict["id"], profile=profile, remote=result)
+
+    snapshot = None
+    if profile.sync_method != SYNC_METHOD_UPDATE:
+        snapshot = _snapshot(payload, result["id"])
+
+    return SyncOutcome(
+        remote=result,
+        state=SyndicationLog.State.SYNCED,
+        payload_hash=digest,
+        payload=snapshot,
+        resources=resource_map,
+        contacted=contacted,
+    )
+
+
+def _is_deleted(details: dict[str, Any]) -> bool:
+    return details["package"].get("state") == "deleted"
+
+
+def _deleted_outcome(package_id: str, profile: types.Profile, digest: str) -> SyncOutcome:
+    # remote copy of the deleted package is never created
+    log.info("Deleted package %s does not exist on %s, nothing to syndicate", package_id, profile.id)
+    return SyncOutcome(
+        remote={"id": "-"},
+        state=SyndicationLog.State.STOPPED,
+        payload_hash=digest,
+        payload=None,
+        resources=None,
+        contacted=False,
+    )
+
+
+def _update_remote_package(
+    ckan: ckanapi.RemoteCKAN,
+    prepared: dict[str, Any],
+    profile: types.Profile,
+    record: SyndicationLog | None,
+    force: bool = False,
+) -> tuple[dict[str, Any], bool]:
+    """Update remote package, sending only changed fields when possible.
+
+    Changes are computed against the snapshot of the payload sent during the
+    previous syndication. Without snapshot, when fields were removed from
+    the payload or when `force` is set, the whole package is sent via
+    `package_update`. When nothing changed, the remote package is not touched
+    at all.
+
+    Returns the remote package and the flag, whether it was sent to the
+    remote portal.
+    """
+    changes = None
+    if profile.sync_method != SYNC_METHOD_UPDATE and record and not force:
+        changes = _compute_changes(_snapshot(prepared, prepared["id"]), record.payload)
+
+    if record and changes == {}:
+        log.debug("Fields of %s did not change since last syndication to %s", prepared["id"], profile.id)
+        return {"id": prepared["id"], "name": record.target_name}, False
+
+    if changes is None:
+        if "resources" not in prepared:
+            # package_update removes resources that are not listed in payload
+            return ckan.action.package_patch(**prepared), True
+        return ckan.action.package_update(**prepared), True
+
+    log.debug("Send changed fields %s of %s to %s", list(changes), prepared["id"], profile.id)
+
+    if profile.sync_method == SYNC_METHOD_REVISE:
+        # fields are dropped before update, so that lists and dicts are
+        # replaced instead of being merged with remote values
+        return ckan.action.package_revise(
+            match={"id": prepared["id"]},
+            filter=[f"-{field}" for field in changes],
+            update=changes,
+        )["package"], True
+
+    return ckan.action.package_patch(id=prepared["id"], **changes), True
+
+
+def _resource_pairs(details: dict[str, Any]) -> list[tuple[str, dict[str, Any]]] | None:
+    """Match prepared resources with IDs of local resources.
+
+    `None` means that plugins changed the list of resources and prepared
+    resources cannot be matched with the local ones.
+    """
+    local = details["package"]["resources"]
+    prepared = details["prepared"].get("resources")
+    if prepared is None or len(prepared) != len(local):
+        return None
+
+    return [
+        (res["id"], {k: v for k, v in data.items() if k != "id"}) for res, data in zip(local, prepared, strict=True)
+    ]
+
+
+def _sync_resources(
+    ckan: ckanapi.RemoteCKAN,
+    remote_package: dict[str, Any],
+    pairs: list[tuple[str, dict[str, Any]]] | None,
+    previous: dict[str, dict[str, str]] | None,
+) -> dict[str, dict[str, str]]:
+    """Synchronize resources of the remote package and return their mapping.
+
+    Mapping contains remote ID and hash of the sent data for every local
+    resource. When resources were sent together with the package, mapping is
+    built from the remote package. Otherwise, only created, changed and deleted
+    resources are sent to the remote portal.
+    """
+    if pairs is None:
+        return {}
+
+    if not previous:
+        remote = remote_package.get("resources", [])
+        if len(remote) != len(pairs):
+            return {}
+        return {
+            local_id: {"id": res["id"], "hash": utils.payload_hash(data)}
+            for (local_id, data), res in zip(pairs, remote, strict=True)
+        }
+
+    mapping: dict[str, dict[str, str]] = {}
+    created: list[str] = []
+
+    for local_id, data in pairs:
+        known = previous.get(local_id)
+        mapping[local_id] = _push_resource(ckan, remote_package["id"], data, known)
+        if not known or mapping[local_id]["id"] != known["id"]:
+            created.append(mapping[local_id]["id"])
+
+    for local_id, known in previous.items():
+        if local_id in mapping:
+            continue
+        try:
+            ckan.action.resource_delete(id=known["id"])
+        except ckanapi.NotFound:
+            log.debug("Remote resource %s is already removed", known["id"])
+
+    # new resources are appended to the end of the remote list
+    order = [res["id"] for res in mapping.values()]
+    current_order = [res["id"] for res in previous.values() if res["id"] in order] + created
+    if order != current_order:
+        ckan.action.package_resource_reorder(id=remote_package["id"], order=order)
+
+    return mapping
+
+
+def _push_resource(
+    ckan: ckanapi.RemoteCKAN,
+    remote_package_id: str,
+    data: dict[str, Any],
+    known: dict[str, str] | None,
+) -> dict[str, str]:
+    """Send resource to the remote portal, if it changed, and return its mapping."""
+    digest = utils.payload_hash(data)
+
+    if known and known["hash"] == digest:
+        return known
+
+    if known:
+        try:
+            ckan.action.resource_patch(id=known["id"], **data)
+        except ckanapi.NotFound:
+            log.warning("Remote resource %s not found, creating new one", known["id"])
+        else:
+            return {"id": known["id"], "hash": digest}
+
+    remote = ckan.action.resource_create(package_id=remote_package_id, **data)
+    return {"id": remote["id"], "hash": digest}
 
-    signals.after_syndication.send(data_dict["id"], profile=data_dict["profile"], remote=result)
 
-    return result
+def _snapshot(prepared: dict[str, Any], target_id: str) -> dict[str, Any]:
+    """Convert prepared payload into JSON-compatible snapshot."""
+    snapshot = json.loads(json.dumps(prepared, default=str))
+    snapshot["id"] = target_id
+    return snapshot
+
+
+def _compute_changes(current: dict[str, Any], previous: dict[str, Any] | None) -> dict[str, Any] | None:
+    """Compute top-level fields that changed since previous syndication.
+
+    `None` means that changes cannot be expressed as a patch.
+    """
+    if not previous or previous.get("id") != current["id"]:
+        return None
+
+    if set(previous) - set(current):
+        return None
+
+    return {key: value for key, value in current.items() if key != "id" and previous.get(key) != value}
+
+
+def _prepare_details(
+    context: ckan_types.Context, id_: str, topic: types.Topic, profile: types.Profile
+) -> dict[str, Any]:
+    return tk.get_action("syndicate_prepare")(
+        context,
+        {"id": id_, "topic": topic.name, "profile": profile.id},
+    )
 
 
 @validate(schema.syndicate_prepare)  # type: ignore
 def syndicate_prepare(context: ckan_types.Context, data_dict: SyncData):
     tk.check_access("syndicate_prepare", context, data_dict)  # type: ignore
 
-    package: dict[str, Any] = tk.get_action("package_show")(
-        {
-            "user": context.get("user", ""),
-            "ignore_auth": context.get("ignore_auth", False),
-            "use_cache": False,
-            "validate": False,
-        },
-        {"id": data_dict["id"]},
-    )
+    if shared := context.get("syndicate_package"):
+        # package fetched once for all profiles. Copy protects it from
+        # modifications made while preparing the payload
+        package: dict[str, Any] = copy.deepcopy(shared)
+    else:
+        package = tk.get_action("package_show")(
+            {
+                "user": context.get("user", ""),
+                "ignore_auth": context.get("ignore_auth", False),
+                "use_cache": False,
+                "validate": False,
+            },
+            {"id": data_dict["id"]},
+        )
 
     ckan = data_dict["profile"].get_target()
 
-    if data_dict["topic"] is types.Topic.update and not SyndicationLog.get(package["id"], data_dict["profile"].id):
+    if data_dict["topic"] is types.Topic.update and not _is_syndicated(
+        SyndicationLog.get(package["id"], data_dict["profile"].id)
+    ):
         data_dict["topic"] = types.Topic.create
 
     base, topic = _compute_base_data_and_topic(package, data_dict["topic"], data_dict["profile"], ckan)
@@ -136,14 +526,7 @@ def syndicate_prepare(context: ckan_types.Context, data_dict: SyncData):
     org = base.pop("organization")
 
     if data_dict["profile"].replicate_organization or data_dict["profile"].update_organization:
-        base["owner_org"] = tk.get_action("syndicate_sync_organization")(
-            context,
-            {
-                "id": org["id"],
-                "profile": data_dict["profile"].id,
-                "update_existing": data_dict["profile"].update_organization,
-            },
-        )
+        base["owner_org"] = _remote_owner_org(context, org["id"], data_dict["profile"])
     else:
         base["owner_org"] = data_dict["profile"].organization
 
@@ -152,6 +535,20 @@ def syndicate_prepare(context: ckan_types.Context, data_dict: SyncData):
     return {"package": package, "prepared": prepared, "topic": topic.name}
 
 
+def _remote_owner_org(context: ckan_types.Context, org_id: str, profile: types.Profile) -> str:
+    if remote_id := utils.get_remote_group(org_id, profile):
+        return remote_id
+
+    return tk.get_action("syndicate_sync_organization")(
+        context,
+        {
+            "id": org_id,
+            "profile": profile.id,
+            "update_existing": profile.update_organization,
+        },
+    )
+
+
 def _prepare(local_id: str, package: dict[str, Any], profile: types.Profile) -> dict[str, Any]:
     extras_dict = {o["key"]: o["value"] for o in package["extras"]}
     extras_dict.pop(profile.field_id, None)
@@ -198,36 +595,57 @@ def _group_or_org_sync(context: ckan_types.Context, data_dict: dict[str, Any], i
         log.exception("Replication error")
         raise
 
+    local_id = group.pop("id")
+
     if not data_dict["update_existing"] and remote_group:
+        utils.remember_remote_group(local_id, profile, remote_group["id"])
         return remote_group["id"]
 
-    local_id = group.pop("id")
-
+    image_hash = None
     if not remote_group:
         action = getattr(ckan.action, f"{type_}_create")
     else:
         group["id"] = remote_group["id"]
         action = getattr(ckan.action, f"{type_}_update")
+        record = SyndicationGroupMap.get(local_id, profile.id)
+        if record and record.target_id == remote_group["id"]:
+            image_hash = record.image_hash
 
-    group = prepare_group_data(local_id, group, profile)
+    group = prepare_group_data(local_id, group, profile, image_hash)
 
     signals.before_group_syndication.send(local_id, profile=profile, details=group)
     remote_group = action(**group)
     signals.after_group_syndication.send(local_id, profile=profile, remote=remote_group)
 
+    utils.remember_remote_group(
+        local_id, profile, remote_group["id"], getattr(group.get("image_upload"), "digest", None)
+    )
+
     return remote_group["id"]
 
 
-def prepare_group_data(local_id: str, group: dict[str, Any], profile: types.Profile) -> dict[str, Any]:
+def prepare_group_data(
+    local_id: str, group: dict[str, Any], profile: types.Profile, image_hash: str | None = None
+) -> dict[str, Any]:
+    """Prepare group for syndication.
+
+    Image is not uploaded if its hash matches `image_hash` of the previously
+    uploaded image or if it cannot be downloaded. In both cases the remote
+    group keeps its current image.
+    """
     for field in GROUP_EXCLUDE_FIELDS:
         group.pop(field, None)
 
     if profile.upload_organization_image:
         group.pop("image_url", None)
-        default_img_url = "https://www.gravatar.com/avatar/123?s=400&d=identicon"
-        image_url = group.pop("image_display_url") or default_img_url
-        image_fd = requests.get(image_url, stream=True, timeout=2).raw
-        group.update(image_upload=image_fd)
+        url = group.pop("image_display_url") or images.DEFAULT_IMAGE_URL
+        try:
+            image = images.fetch(url)
+        except requests.RequestException:
+            log.exception("Cannot download image %s of group %s", url, local_id)
+        else:
+            if image.digest != image_hash:
+                group.update(image_upload=image)
 
     for plugin in p.PluginImplementations(ISyndicate):
         group = plugin.prepare_group_for_syndication(local_id, group, profile)
@@ -249,15 +667,24 @@ def _compute_base_data_and_topic(
 
     else:
         syndicate_record = SyndicationLog.get(package["id"], profile.id)
-        if not syndicate_record:
+        if not syndicate_record or not _is_syndicated(syndicate_record):
             return _compute_base_data_and_topic(package, types.Topic.create, profile, ckan)
 
+        if _can_update_optimistically(syndicate_record, profile):
+            # the remote package is expected to exist. If it was removed,
+            # package_update fails with NotFound and the package is created
+            # again by the caller.
+            base["id"] = syndicate_record.target_id
+            if not profile.refresh_package_name:
+                base["name"] = syndicate_record.target_name
+            return base, topic
+
         try:
             remote_package = ckan.action.package_show(id=syndicate_record.target_id)
-        except ckanapi.CKANAPIError:
-            raise ckanapi.NotFound("The remote portal is unavailable")  # noqa: B904
         except ckanapi.NotFound:
             return _compute_base_data_and_topic(package, types.Topic.create, profile, ckan)
+        except ckanapi.CKANAPIError:
+            raise ckanapi.NotFound("The remote portal is unavailable")  # noqa: B904
 
         # Keep the existing remote ID and Name
         base["id"] = remote_package["id"]
@@ -267,6 +694,21 @@ def _compute_base_data_and_topic(
     return base, topic
 
 
+def _is_syndicated(record: SyndicationLog | None) -> bool:
+    """Check whether the log entry points to the remote package.
+
+    Skipped packages get log entries without remote ID.
+    """
+    return record is not None and record.target_id != "-"
+
+
+def _can_update_optimistically(record: SyndicationLog, profile: types.Profile) -> bool:
+    if not profile.optimistic_update or record.target_id == "-":
+        return False
+
+    return bool(record.target_name or profile.refresh_package_name)
+
+
 def _compute_remote_name(package: dict[str, Any], profile: types.Profile) -> str:
     name = package["name"]
 
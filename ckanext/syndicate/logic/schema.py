@@ -20,16 +20,19 @@ def into_profile(value: str) -> Profile:
 
 
 @validator_args
-def syndicate_sync(
+def syndicate_sync(  # noqa: PLR0913 PLR0917
     not_missing: types.Validator,
     one_of: types.ValidatorFactory,
     unicode_safe: types.Validator,
     package_id_or_name_exists: types.Validator,
+    default: types.ValidatorFactory,
+    boolean_validator: types.Validator,
 ) -> types.Schema:
     return {
         "id": [not_missing, package_id_or_name_exists],
         "topic": [not_missing, one_of(["create", "update"]), into_topic],
         "profile": [not_missing, unicode_safe, into_profile],
+        "force": [default(False), boolean_validator],
     }
 
 
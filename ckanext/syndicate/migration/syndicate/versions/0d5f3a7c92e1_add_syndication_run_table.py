@@ -0,0 +1,36 @@
+"""Add syndication_run table.
+
+Revision ID: 0d5f3a7c92e1
+Revises: 7e2a9c4b1d58
+Create Date: 2026-10-18 19:05:47.302914
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0d5f3a7c92e1"
+down_revision = "7e2a9c4b1d58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "syndication_run",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("profile_id", sa.String(length=255), nullable=False),
+        sa.Column("state", sa.String(length=50), nullable=False),
+        sa.Column("last_id", sa.Text(), nullable=True),
+        sa.Column("processed", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("throughput", sa.Float(), nullable=True),
+        sa.Column("eta", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id", "profile_id"),
+    )
+
+
+def downgrade():
+    op.drop_table("syndication_run")
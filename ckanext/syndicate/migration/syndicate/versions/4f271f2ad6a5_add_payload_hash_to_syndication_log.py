@@ -0,0 +1,23 @@
+"""Add payload_hash to syndication_log.
+
+Revision ID: 4f271f2ad6a5
+Revises: b1c3e920f499
+Create Date: 2026-10-18 10:12:41.118204
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "4f271f2ad6a5"
+down_revision = "b1c3e920f499"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("syndication_log", sa.Column("payload_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    op.drop_column("syndication_log", "payload_hash")
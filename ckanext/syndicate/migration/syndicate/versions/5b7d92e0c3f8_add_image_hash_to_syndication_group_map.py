@@ -0,0 +1,23 @@
+"""Add image_hash to syndication_group_map.
+
+Revision ID: 5b7d92e0c3f8
+Revises: e83a4c6f2d10
+Create Date: 2026-10-18 13:27:50.310467
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5b7d92e0c3f8"
+down_revision = "e83a4c6f2d10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("syndication_group_map", sa.Column("image_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    op.drop_column("syndication_group_map", "image_hash")
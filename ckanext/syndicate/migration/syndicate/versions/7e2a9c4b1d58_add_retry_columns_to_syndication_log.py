@@ -0,0 +1,30 @@
+"""Add retry columns to syndication_log.
+
+Revision ID: 7e2a9c4b1d58
+Revises: c4d8e15f6a90
+Create Date: 2026-10-18 17:42:10.518203
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7e2a9c4b1d58"
+down_revision = "c4d8e15f6a90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "syndication_log",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column("syndication_log", sa.Column("retry_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_syndication_log_retry_at", "syndication_log", ["retry_at"])
+
+
+def downgrade():
+    op.drop_index("ix_syndication_log_retry_at", "syndication_log")
+    op.drop_column("syndication_log", "retry_at")
+    op.drop_column("syndication_log", "attempts")
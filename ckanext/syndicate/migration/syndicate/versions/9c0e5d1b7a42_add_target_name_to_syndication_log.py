@@ -0,0 +1,23 @@
+"""Add target_name to syndication_log.
+
+Revision ID: 9c0e5d1b7a42
+Revises: 4f271f2ad6a5
+Create Date: 2026-10-18 11:03:17.552910
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9c0e5d1b7a42"
+down_revision = "4f271f2ad6a5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("syndication_log", sa.Column("target_name", sa.String(length=255), nullable=True))
+
+
+def downgrade():
+    op.drop_column("syndication_log", "target_name")
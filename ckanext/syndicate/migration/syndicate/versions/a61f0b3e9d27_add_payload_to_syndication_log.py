@@ -0,0 +1,23 @@
+"""Add payload to syndication_log.
+
+Revision ID: a61f0b3e9d27
+Revises: 5b7d92e0c3f8
+Create Date: 2026-10-18 14:06:12.772145
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a61f0b3e9d27"
+down_revision = "5b7d92e0c3f8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("syndication_log", sa.Column("payload", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("syndication_log", "payload")
@@ -0,0 +1,23 @@
+"""Add resources to syndication_log.
+
+Revision ID: c4d8e15f6a90
+Revises: a61f0b3e9d27
+Create Date: 2026-10-18 15:18:33.021876
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4d8e15f6a90"
+down_revision = "a61f0b3e9d27"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("syndication_log", sa.Column("resources", sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("syndication_log", "resources")
@@ -0,0 +1,35 @@
+"""Add syndication_group_map table.
+
+Revision ID: e83a4c6f2d10
+Revises: 9c0e5d1b7a42
+Create Date: 2026-10-18 12:41:05.904311
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e83a4c6f2d10"
+down_revision = "9c0e5d1b7a42"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "syndication_group_map",
+        sa.Column("local_id", sa.String(length=255), nullable=False),
+        sa.Column("profile_id", sa.String(length=255), nullable=False),
+        sa.Column("target_id", sa.String(length=255), nullable=False),
+        sa.Column("timestamp", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["local_id"],
+            ["group.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("local_id", "profile_id"),
+    )
+
+
+def downgrade():
+    op.drop_table("syndication_group_map")
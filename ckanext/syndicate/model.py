@@ -1,18 +1,29 @@
 from __future__ import annotations
 
 import logging
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime as dt
 from datetime import timezone as tz
+from typing import Any
 
 from sqlalchemy import (
+    JSON,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Index,
+    Integer,
     PrimaryKeyConstraint,
     String,
     Text,
+    case,
+    func,
 )
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Mapped, relationship
 
 import ckan.plugins.toolkit as tk
@@ -21,25 +32,55 @@ from ckan import model
 log = logging.getLogger(__name__)
 
 
+class _LogCache:
+    """Syndication log entries of preloaded packages."""
+
+    def __init__(self, session: Any, package_ids: set[str]):
+        self.session = session
+        self.packages = package_ids
+        self.entries: dict[tuple[str, str], SyndicationLog] = {}
+
+
+_preloaded: ContextVar[_LogCache | None] = ContextVar("syndication_log_cache", default=None)
+
+
+def _active_cache() -> _LogCache | None:
+    cache = _preloaded.get()
+    # context is copied into threads, but entries belong to the session of
+    # the thread that loaded them
+    if cache is None or cache.session is not model.Session():
+        return None
+    return cache
+
+
 class SyndicationLog(tk.BaseModel):
     __tablename__ = "syndication_log"
 
     __table_args__ = (
         PrimaryKeyConstraint("local_id", "profile_id"),
         Index("ix_syndication_log_local_profile", "local_id", "profile_id"),
+        Index("ix_syndication_log_retry_at", "retry_at"),
     )
 
     class State:
         STOPPED = "stopped"
         FAILED = "failed"
         SYNCED = "synced"
+        UNCHANGED = "unchanged"
 
     local_id: Mapped[str] = Column(ForeignKey(model.Package.id, ondelete="CASCADE"), nullable=False)  # type: ignore
     profile_id: Mapped[str] = Column(String(length=255), nullable=False)  # type: ignore
     target_id: Mapped[str] = Column(String(length=255), nullable=False, default="-")  # type: ignore
+    target_name: Mapped[str | None] = Column(String(length=255))  # type: ignore
 
     state: Mapped[str] = Column(String(length=50), nullable=False)  # type: ignore
     error: Mapped[str | None] = Column(Text)  # type: ignore
+    payload_hash: Mapped[str | None] = Column(String(length=64))  # type: ignore
+    # missing values must be SQL NULL, so that `bulk_write` keeps existing ones
+    payload: Mapped[dict[str, Any] | None] = Column(JSON(none_as_null=True))  # type: ignore
+    resources: Mapped[dict[str, dict[str, str]] | None] = Column(JSON(none_as_null=True))  # type: ignore
+    attempts: Mapped[int] = Column(Integer, nullable=False, default=0, server_default="0")  # type: ignore
+    retry_at: Mapped[dt | None] = Column(DateTime(timezone=True))  # type: ignore
     timestamp: Mapped[dt] = Column(DateTime(timezone=True), default=lambda: dt.now(tz=tz.utc), nullable=False)  # type: ignore
 
     local_package: Mapped[model.Package] = relationship(  # type: ignore
@@ -55,6 +96,12 @@ class SyndicationLog(tk.BaseModel):
         state: str = State.SYNCED,
         error: str | None = None,
         defer_commit: bool = False,
+        payload_hash: str | None = None,
+        target_name: str | None = None,
+        payload: dict[str, Any] | None = None,
+        resources: dict[str, dict[str, str]] | None = None,
+        attempts: int = 0,
+        retry_at: dt | None = None,
     ) -> SyndicationLog:
         log_entry = cls.get(local_id, profile_id)
 
@@ -65,17 +112,35 @@ class SyndicationLog(tk.BaseModel):
                 target_id=target_id or "-",
                 state=state,
                 error=error,
+                payload_hash=payload_hash,
+                target_name=target_name,
+                payload=payload,
+                resources=resources,
+                attempts=attempts,
+                retry_at=retry_at,
                 timestamp=dt.now(tz=tz.utc),
             )
             model.Session.add(log_entry)
+            if (cache := _active_cache()) is not None and local_id in cache.packages:
+                cache.entries[(local_id, profile_id)] = log_entry
 
         else:
             # TODO: should we allow updating it?
             # we don't want to lose the target_id once set
             if target_id is not None:
                 log_entry.target_id = target_id
+            if payload_hash is not None:
+                log_entry.payload_hash = payload_hash
+            if target_name is not None:
+                log_entry.target_name = target_name
+            if payload is not None:
+                log_entry.payload = payload
+            if resources is not None:
+                log_entry.resources = resources
             log_entry.state = state
             log_entry.error = error
+            log_entry.attempts = attempts
+            log_entry.retry_at = retry_at
             log_entry.timestamp = dt.now(tz=tz.utc)
 
         if not defer_commit:
@@ -83,8 +148,107 @@ class SyndicationLog(tk.BaseModel):
 
         return log_entry
 
+    @classmethod
+    def bulk_write(cls, rows: Iterable[dict[str, Any]], defer_commit: bool = False) -> None:
+        """Insert or update many log entries with a single statement.
+
+        Rows accept the same keys as `write`. Just as in `write`, missing
+        `target_id`, `payload_hash`, `target_name`, `payload` and `resources`
+        do not replace existing values. When the same entry appears several
+        times, the last row wins.
+        """
+        now = dt.now(tz=tz.utc)
+        values = {
+            (row["local_id"], row["profile_id"]): {
+                "local_id": row["local_id"],
+                "profile_id": row["profile_id"],
+                "target_id": row.get("target_id") or "-",
+                "state": row.get("state", cls.State.SYNCED),
+                "error": row.get("error"),
+                "payload_hash": row.get("payload_hash"),
+                "target_name": row.get("target_name"),
+                "payload": row.get("payload"),
+                "resources": row.get("resources"),
+                "attempts": row.get("attempts", 0),
+                "retry_at": row.get("retry_at"),
+                "timestamp": now,
+            }
+            for row in rows
+        }
+        if not values:
+            return
+
+        table = cls.__table__
+        stmt = insert(table).values(list(values.values()))
+        kept = {
+            name: func.coalesce(stmt.excluded[name], table.c[name])
+            for name in ("payload_hash", "target_name", "payload", "resources")
+        }
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.local_id, table.c.profile_id],
+            set_={
+                **kept,
+                "target_id": case(
+                    (stmt.excluded.target_id == "-", table.c.target_id),
+                    else_=stmt.excluded.target_id,
+                ),
+                "state": stmt.excluded.state,
+                "error": stmt.excluded.error,
+                "attempts": stmt.excluded.attempts,
+                "retry_at": stmt.excluded.retry_at,
+                "timestamp": stmt.excluded.timestamp,
+            },
+        )
+        model.Session.execute(stmt)
+
+        if (cache := _active_cache()) is not None:
+            # loaded entries do not reflect the statement
+            cache.packages.difference_update(local_id for local_id, _ in values)
+
+        if not defer_commit:
+            model.Session.commit()
+
+    @classmethod
+    @contextmanager
+    def preload(cls, local_ids: Iterable[str]) -> Iterator[None]:
+        """Load log entries of packages using a single query.
+
+        Inside the block, `get` returns loaded entries without database
+        queries. Packages without entries are cached as well. Nested blocks
+        reuse entries that are already loaded.
+
+        Example:
+            with SyndicationLog.preload(chunk):
+                for package_id in chunk:
+                    ...
+
+        """
+        ids = set(local_ids)
+        current = _active_cache()
+        if current is not None and ids <= current.packages:
+            yield
+            return
+
+        cache = _LogCache(model.Session(), ids)
+        for entry in model.Session.query(cls).filter(cls.local_id.in_(ids)):
+            cache.entries[(entry.local_id, entry.profile_id)] = entry
+
+        token = _preloaded.set(cache)
+        try:
+            yield
+        finally:
+            _preloaded.reset(token)
+
     @classmethod
     def get(cls, local_id: str, profile_id: str) -> SyndicationLog | None:
+        cache = _active_cache()
+        if cache is not None and local_id in cache.packages:
+            entry = cache.entries.get((local_id, profile_id))
+            # entries added to the session are gone after rollback
+            if entry is None or entry in model.Session:
+                return entry
+            cache.packages.discard(local_id)
+
         return (
             model.Session.query(SyndicationLog)
             .filter(
@@ -93,3 +257,137 @@ class SyndicationLog(tk.BaseModel):
             )
             .first()
         )
+
+
+class LogBuffer:
+    """Buffered writer of syndication log.
+
+    Entries are written by `SyndicationLog.bulk_write` once `size` entries are
+    collected and when the buffer is flushed. Buffer can be shared by threads:
+    every flush uses and commits the database session of the current thread.
+
+    Example:
+        with LogBuffer() as buffer:
+            buffer.add(local_id=id_, profile_id=profile.id, state=state)
+
+    """
+
+    def __init__(self, size: int = 100):
+        self.size = size
+        self._rows: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> LogBuffer:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.flush()
+
+    def add(self, **row: Any) -> None:
+        with self._lock:
+            self._rows.append(row)
+            if len(self._rows) < self.size:
+                return
+            rows, self._rows = self._rows, []
+
+        SyndicationLog.bulk_write(rows)
+
+    def flush(self) -> None:
+        with self._lock:
+            rows, self._rows = self._rows, []
+
+        SyndicationLog.bulk_write(rows)
+
+
+class SyndicationGroupMap(tk.BaseModel):
+    """Mapping between local groups/organizations and their remote copies."""
+
+    __tablename__ = "syndication_group_map"
+
+    __table_args__ = (PrimaryKeyConstraint("local_id", "profile_id"),)
+
+    local_id: Mapped[str] = Column(ForeignKey(model.Group.id, ondelete="CASCADE"), nullable=False)  # type: ignore
+    profile_id: Mapped[str] = Column(String(length=255), nullable=False)  # type: ignore
+    target_id: Mapped[str] = Column(String(length=255), nullable=False)  # type: ignore
+    image_hash: Mapped[str | None] = Column(String(length=64))  # type: ignore
+    timestamp: Mapped[dt] = Column(DateTime(timezone=True), default=lambda: dt.now(tz=tz.utc), nullable=False)  # type: ignore
+
+    @classmethod
+    def write(
+        cls,
+        local_id: str,
+        profile_id: str,
+        target_id: str,
+        image_hash: str | None = None,
+        defer_commit: bool = False,
+    ) -> SyndicationGroupMap:
+        entry = cls.get(local_id, profile_id)
+
+        if not entry:
+            entry = cls(local_id=local_id, profile_id=profile_id)
+            model.Session.add(entry)
+
+        entry.target_id = target_id
+        if image_hash is not None:
+            entry.image_hash = image_hash
+        entry.timestamp = dt.now(tz=tz.utc)
+
+        if not defer_commit:
+            model.Session.commit()
+
+        return entry
+
+    @classmethod
+    def get(cls, local_id: str, profile_id: str) -> SyndicationGroupMap | None:
+        return (
+            model.Session.query(SyndicationGroupMap)
+            .filter(
+                SyndicationGroupMap.local_id == local_id,
+                SyndicationGroupMap.profile_id == profile_id,
+            )
+            .first()
+        )
+
+    @classmethod
+    def delete(cls, local_id: str, profile_id: str, defer_commit: bool = False) -> None:
+        model.Session.query(SyndicationGroupMap).filter(
+            SyndicationGroupMap.local_id == local_id,
+            SyndicationGroupMap.profile_id == profile_id,
+        ).delete()
+
+        if not defer_commit:
+            model.Session.commit()
+
+
+class SyndicationRun(tk.BaseModel):
+    """Progress of the bulk syndication to a single profile."""
+
+    __tablename__ = "syndication_run"
+
+    __table_args__ = (PrimaryKeyConstraint("id", "profile_id"),)
+
+    class State:
+        RUNNING = "running"
+        FAILED = "failed"
+        FINISHED = "finished"
+
+    id: Mapped[str] = Column(String(length=36), nullable=False)  # type: ignore
+    profile_id: Mapped[str] = Column(String(length=255), nullable=False)  # type: ignore
+    state: Mapped[str] = Column(String(length=50), nullable=False, default=State.RUNNING)  # type: ignore
+    # the last processed package in the order of package IDs
+    last_id: Mapped[str | None] = Column(Text)  # type: ignore
+    processed: Mapped[int] = Column(Integer, nullable=False, default=0)  # type: ignore
+    total: Mapped[int] = Column(Integer, nullable=False, default=0)  # type: ignore
+    # packages per second
+    throughput: Mapped[float | None] = Column(Float)  # type: ignore
+    eta: Mapped[dt | None] = Column(DateTime(timezone=True))  # type: ignore
+    started_at: Mapped[dt] = Column(DateTime(timezone=True), default=lambda: dt.now(tz=tz.utc), nullable=False)  # type: ignore
+    updated_at: Mapped[dt] = Column(DateTime(timezone=True), default=lambda: dt.now(tz=tz.utc), nullable=False)  # type: ignore
+
+    @classmethod
+    def get(cls, run_id: str) -> list[SyndicationRun]:
+        return model.Session.query(SyndicationRun).filter(SyndicationRun.id == run_id).all()
+
+    @classmethod
+    def latest(cls, limit: int = 20) -> list[SyndicationRun]:
+        return model.Session.query(SyndicationRun).order_by(SyndicationRun.started_at.desc()).limit(limit).all()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any
+
+import ckan.plugins.toolkit as tk
+
+from ckanext.syndicate import config
+from ckanext.syndicate.types import Profile
+
+PROFILE_PREFIX = "ckanext.syndicate.profile."
+log = logging.getLogger(__name__)
+
+
+class ProfileRegistry:
+    """Syndication profiles indexed by ID.
+
+    Profiles are parsed from the config file once. With
+    `ckanext.syndicate.profile_reload_interval`, options of profiles are
+    checked periodically and profiles are rebuilt when options change. Every
+    profile has a version, that is a fingerprint of its options.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles: dict[str, Profile] = {}
+        self._versions: dict[str, str] = {}
+        self._fingerprint: str | None = None
+        self._checked_at = 0.0
+
+    def all(self) -> list[Profile]:
+        """Return all configured profiles."""
+        self._ensure_fresh()
+        return list(self._profiles.values())
+
+    def get(self, profile_id: str) -> Profile | None:
+        """Return profile by its ID."""
+        self._ensure_fresh()
+        return self._profiles.get(profile_id)
+
+    def version(self, profile_id: str) -> str | None:
+        """Return fingerprint of the profile's options."""
+        self._ensure_fresh()
+        return self._versions.get(profile_id)
+
+    def reload(self, force: bool = False) -> bool:
+        """Read profiles from the config.
+
+        Profiles are rebuilt only if their options changed, unless `force` is
+        set. Returns `True` if profiles were rebuilt.
+        """
+        options = _profile_options()
+        fingerprint = _fingerprint(options)
+
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if not force and fingerprint == self._fingerprint:
+                return False
+
+            by_profile: dict[str, dict[str, Any]] = defaultdict(dict)
+            for opt, value in options:
+                profile, attr = opt[len(PROFILE_PREFIX) :].split(".", 1)
+                by_profile[profile][attr] = value
+
+            if self._fingerprint not in (None, fingerprint):
+                log.info("Syndication profiles changed, reloading")
+
+            self._profiles = {id_: Profile(id=id_, **data) for id_, data in by_profile.items()}
+            self._versions = {id_: _fingerprint(sorted(data.items())) for id_, data in by_profile.items()}
+            self._fingerprint = fingerprint
+
+        return True
+
+    def _ensure_fresh(self) -> None:
+        if self._fingerprint is None:
+            self.reload()
+            return
+
+        interval = config.get_profile_reload_interval()
+        if interval > 0 and time.monotonic() - self._checked_at >= interval:
+            self.reload()
+
+
+def resolve_job_profile(profile: Profile | str, version: str | None = None) -> str | None:
+    """Find the profile of the background job.
+
+    Jobs carry the ID and version of the profile. When the profile changed
+    after the job was enqueued, the job uses current options of the profile
+    or, with `ckanext.syndicate.drop_stale_jobs`, is dropped. Returns `None`
+    if the job must not be executed.
+
+    Jobs enqueued by previous versions of the extension carry the whole
+    profile and are supported as well.
+    """
+    profile_id = profile.id if isinstance(profile, Profile) else profile
+    current = profiles.version(profile_id)
+
+    if current is None:
+        log.error("Profile %s does not exist", profile_id)
+        return None
+
+    if version and version != current:
+        if config.get_drop_stale_jobs():
+            log.warning("Profile %s changed after the job was enqueued, job is dropped", profile_id)
+            return None
+
+        log.warning("Profile %s changed after the job was enqueued, current options are used", profile_id)
+
+    return profile_id
+
+
+def _profile_options() -> list[tuple[str, Any]]:
+    return sorted((opt, v) for opt, v in tk.config.items() if opt.startswith(PROFILE_PREFIX))
+
+
+def _fingerprint(options: list[tuple[str, Any]]) -> str:
+    serialized = "\n".join(f"{key}={value}" for key, value in options)
+    return hashlib.sha256(serialized.encode()).hexdigest()[:16]
+
+
+profiles = ProfileRegistry()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import logging
+import random
+from typing import TYPE_CHECKING
+
+import requests
+
+import ckan.plugins.toolkit as tk
+from ckan.lib.redis import connect_to_redis
+
+if TYPE_CHECKING:
+    from ckanext.syndicate.types import Profile
+
+log = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Remote portal is considered unhealthy and is not contacted."""
+
+    def __init__(self, profile_id: str, delay: float):
+        super().__init__(f"Circuit of profile {profile_id} is open for {delay:.0f} more seconds")
+        self.delay = delay
+
+
+def is_transient(error: Exception) -> bool:
+    """Decide whether the failed syndication may succeed later.
+
+    Timeouts, connection errors, throttling and server errors of the remote
+    portal are transient. Everything else, including ValidationError,
+    NotAuthorized and NotFound reported by the remote portal, is permanent.
+    """
+    if isinstance(error, CircuitOpenError | requests.ConnectionError | requests.Timeout):
+        return True
+
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return is_transient_status(error.response.status_code)
+
+    return False
+
+
+def is_transient_status(status: int) -> bool:
+    return status == requests.codes.too_many_requests or status >= 500  # noqa: PLR2004
+
+
+def raise_for_transient_status(resp: requests.Response, *args: object, **kwargs: object) -> None:
+    """Response hook that turns throttling and server errors into exceptions.
+
+    Other error responses are left for ckanapi, that converts them into
+    ValidationError, NotAuthorized, etc.
+    """
+    if is_transient_status(resp.status_code):
+        resp.raise_for_status()
+
+
+def backoff_delay(profile: Profile, attempt: int) -> float:
+    """Compute number of seconds before the next attempt.
+
+    Delay grows exponentially with every attempt. Random jitter spreads retries
+    of packages that failed at the same moment.
+    """
+    delay = profile.retry_delay * 2 ** (attempt - 1)
+    return random.uniform(delay / 2, delay)  # noqa: S311
+
+
+class CircuitBreaker:
+    """Per-profile circuit breaker shared by all processes through Redis.
+
+    After `circuit_threshold` consecutive transient failures the circuit opens
+    for `circuit_cooldown` seconds: syndications to the profile fail
+    immediately and retries are postponed. When the cooldown is over, the
+    next syndication probes the remote portal. Its failure opens the circuit
+    again, while success closes it.
+    """
+
+    def __init__(self, profile: Profile):
+        self.profile_id = profile.id
+        self.threshold = profile.circuit_threshold
+        self.cooldown = profile.circuit_cooldown
+        prefix = "{}:syndicate:circuit:{}".format(tk.config["ckan.site_id"], profile.id)
+        self.failures_key = prefix + ":failures"
+        self.open_key = prefix + ":open"
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if the remote portal must not be contacted."""
+        if delay := self.open_for():
+            raise CircuitOpenError(self.profile_id, delay)
+
+    def open_for(self) -> float:
+        """Seconds left until the circuit closes. 0 if it's closed."""
+        if not self.enabled:
+            return 0
+
+        ttl = connect_to_redis().pttl(self.open_key)
+        return max(0, ttl / 1000)
+
+    def record_success(self) -> None:
+        if self.enabled:
+            connect_to_redis().delete(self.failures_key)
+
+    def record_failure(self) -> None:
+        if not self.enabled:
+            return
+
+        conn = connect_to_redis()
+        with conn.pipeline() as pipe:
+            pipe.incr(self.failures_key)
+            # forget failures that are too old to indicate unhealthy portal
+            pipe.expire(self.failures_key, self.cooldown * 10)
+            failures, _ = pipe.execute()
+
+        if failures >= self.threshold:
+            log.warning("Open circuit of profile %s after %s failures", self.profile_id, failures)
+            conn.set(self.open_key, failures, ex=self.cooldown)
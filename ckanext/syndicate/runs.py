@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from collections.abc import Iterable, Iterator
+from datetime import datetime as dt
+from datetime import timedelta as td
+from datetime import timezone as tz
+
+from sqlalchemy.orm import Query
+
+import ckan.plugins.toolkit as tk
+from ckan import model
+
+from ckanext.syndicate import utils
+from ckanext.syndicate.model import SyndicationRun
+from ckanext.syndicate.types import Profile
+
+log = logging.getLogger(__name__)
+
+# weight of the latest chunk in the throughput estimation
+SMOOTHING = 0.3
+
+
+class BulkRun:
+    """Checkpointed bulk syndication.
+
+    Packages are processed in chunks, ordered by ID. After every completed
+    chunk, the ID of its last package is recorded for each profile together
+    with progress, throughput and ETA of the run. Resumed run continues after
+    the recorded package.
+
+    Example:
+        run = BulkRun.start(profiles)
+        for chunk in run.chunks(packages):
+            for package in chunk:
+                ...
+            pool.wait()
+            run.checkpoint(chunk)
+        run.finish()
+
+    """
+
+    def __init__(self, records: list[SyndicationRun]):
+        self.id = records[0].id
+        self.records = {r.profile_id: r for r in records}
+
+    @classmethod
+    def start(cls, profiles: Iterable[Profile]) -> BulkRun:
+        """Register a new run for the profiles."""
+        run_id = str(uuid.uuid4())
+        records = [
+            SyndicationRun(id=run_id, profile_id=profile.id, state=SyndicationRun.State.RUNNING, processed=0, total=0)
+            for profile in profiles
+        ]
+        if not records:
+            raise tk.ValidationError({"profile": ["No profiles configured"]})
+
+        model.Session.add_all(records)
+        model.Session.commit()
+        return cls(records)
+
+    @classmethod
+    def resume(cls, run_id: str) -> BulkRun:
+        """Continue the interrupted run."""
+        records = SyndicationRun.get(run_id)
+        if not records:
+            raise tk.ObjectNotFound(f"Run {run_id} not found")
+
+        now = dt.now(tz=tz.utc)
+        for record in records:
+            if record.state != SyndicationRun.State.FINISHED:
+                record.state = SyndicationRun.State.RUNNING
+            # time of interruption does not count towards throughput
+            record.updated_at = now
+
+        model.Session.commit()
+        return cls(records)
+
+    def estimate(self, total: int, profiles: Iterable[Profile] | None = None) -> None:
+        """Record the number of packages the run processes for profiles.
+
+        The estimation made by the original run is kept when run is resumed.
+        """
+        ids = {p.id for p in profiles} if profiles else set(self.records)
+        for profile_id in ids:
+            record = self.records.get(profile_id)
+            if record and not record.total:
+                record.total = total
+
+        model.Session.commit()
+
+    def includes(self, profile: Profile, package_id: str) -> bool:
+        """Check whether the package must be syndicated to the profile."""
+        record = self.records.get(profile.id)
+        if not record or record.state == SyndicationRun.State.FINISHED:
+            return False
+
+        return record.last_id is None or package_id > record.last_id
+
+    def chunks(
+        self,
+        packages: Query[model.Package],
+        profiles: Iterable[Profile] | None = None,
+        size: int = 100,
+    ) -> Iterator[list[utils.PackageStub]]:
+        """Yield chunks of packages that were not processed by the run.
+
+        Keyset pagination starts after the oldest checkpoint among profiles.
+        """
+        records = [self.records[p.id] for p in profiles if p.id in self.records] if profiles else self.records.values()
+        pending = [r for r in records if r.state != SyndicationRun.State.FINISHED]
+        if not pending:
+            return
+
+        last_id = None if any(r.last_id is None for r in pending) else min(r.last_id for r in pending)
+        yield from utils.package_chunks(packages, size, last_id)
+
+    def checkpoint(self, chunk: list[utils.PackageStub], profiles: Iterable[Profile] | None = None) -> None:
+        """Record that all packages of the chunk are processed."""
+        ids = {p.id for p in profiles} if profiles else set(self.records)
+        now = dt.now(tz=tz.utc)
+        last_id = chunk[-1].id
+
+        for profile_id in ids:
+            record = self.records.get(profile_id)
+            if not record or (record.last_id is not None and record.last_id >= last_id):
+                continue
+
+            done = len([p for p in chunk if record.last_id is None or p.id > record.last_id])
+            record.processed += done
+            record.last_id = last_id
+
+            elapsed = max((now - record.updated_at).total_seconds(), 0.001)
+            speed = done / elapsed
+            record.throughput = (
+                speed if record.throughput is None else (SMOOTHING * speed + (1 - SMOOTHING) * record.throughput)
+            )
+            if record.throughput and record.total > record.processed:
+                record.eta = now + td(seconds=(record.total - record.processed) / record.throughput)
+            record.updated_at = now
+
+        model.Session.commit()
+
+    def finish(self, profiles: Iterable[Profile] | None = None) -> None:
+        self._set_state(SyndicationRun.State.FINISHED, profiles)
+
+    def fail(self) -> None:
+        self._set_state(SyndicationRun.State.FAILED)
+
+    def _set_state(self, state: str, profiles: Iterable[Profile] | None = None) -> None:
+        ids = {p.id for p in profiles} if profiles else set(self.records)
+        now = dt.now(tz=tz.utc)
+
+        for profile_id, record in self.records.items():
+            if profile_id not in ids or record.state == SyndicationRun.State.FINISHED:
+                continue
+
+            record.state = state
+            record.updated_at = now
+            if state == SyndicationRun.State.FINISHED:
+                record.eta = now
+
+        model.Session.commit()
+        log.info("Syndication run %s: %s", self.id, state)
@@ -58,6 +58,7 @@ class StateFormatter(t.formatters.BaseFormatter):
             model.SyndicationLog.State.SYNCED: "success",
             model.SyndicationLog.State.FAILED: "danger",
             model.SyndicationLog.State.STOPPED: "black",
+            model.SyndicationLog.State.UNCHANGED: "secondary",
         }
 
         label_type = state_map.get(value, "black")
@@ -5,7 +5,7 @@ from ckan import model
 
 import ckanext.tables.shared as t
 
-from ckanext.syndicate import utils
+from ckanext.syndicate import bulk, utils
 from ckanext.syndicate.tables.data_sources import (
     ProfileLogsDataSource,
     ProfilesDataSource,
@@ -182,7 +182,12 @@ class ProfileLogsTable(t.TableDefinition):
             profile = next((p for p in pkg_profiles if p.id == self.profile_id), None)
 
             if profile:
-                utils.sync_package(row["pkg_id"], Topic.update, profile)
+                # job function would wait for debounce and take the pending
+                # syndication away from the queued job
+                tk.get_action("syndicate_sync")(
+                    {"ignore_auth": True},
+                    {"id": row["pkg_id"], "topic": Topic.update.name, "profile": profile.id, "force": True},
+                )
 
         return t.ActionHandlerResult(
             success=True,
@@ -191,18 +196,19 @@ class ProfileLogsTable(t.TableDefinition):
         )
 
     def bulk_action_resyndicate_package(self, rows: list[t.Row]) -> t.ActionHandlerResult:
-        for row in rows:
-            package = model.Package.get(row["pkg_id"])
+        with bulk.BackgroundSync(force=True) as queue, utils.cached_skip_decisions():
+            for row in rows:
+                package = model.Package.get(row["pkg_id"])
 
-            if not package:
-                continue
+                if not package:
+                    continue
 
-            # we call it to trigger a skip check
-            pkg_profiles = utils.profiles_for(package)
-            profile = next((p for p in pkg_profiles if p.id == self.profile_id), None)
+                # we call it to trigger a skip check
+                pkg_profiles = utils.profiles_for(package)
+                profile = next((p for p in pkg_profiles if p.id == self.profile_id), None)
 
-            if profile:
-                utils.syndicate_dataset(row["pkg_id"], Topic.update, profile)
+                if profile:
+                    queue.submit(row["pkg_id"], profile)
 
         return t.ActionHandlerResult(
             success=True,
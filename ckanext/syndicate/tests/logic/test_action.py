@@ -1,8 +1,12 @@
 import ckanapi
 import pytest
+import requests
 
+from ckan import model
 from ckan.tests.helpers import call_action
 
+from ckanext.syndicate import utils
+from ckanext.syndicate.logic.action import prepare_group_data
 from ckanext.syndicate.model import SyndicationLog
 from ckanext.syndicate.utils import get_profiles
 
@@ -114,6 +118,151 @@ class TestSync:
         local_resource_url = local_resource["url"]
         assert local_resource_url == remote_resource_url
 
+    def test_unchanged_package_is_not_pushed(self, ckan, package_factory, remote_org, mocker):
+        dataset = package_factory()
+        profile = get_profiles(force_refresh=True)[0]
+
+        call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+        call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id)
+
+        ckan.action.package_update = mocker.Mock()
+        result = call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id)
+
+        assert result["state"] == SyndicationLog.State.UNCHANGED
+        assert not ckan.action.package_update.called
+
+        ckan.action.package_update.return_value = {"id": result["target_id"]}
+        result = call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id, force=True)
+
+        assert result["state"] == SyndicationLog.State.SYNCED
+        assert ckan.action.package_update.called
+
+    @pytest.mark.usefixtures("clean_redis")
+    def test_only_remote_calls_close_circuit(self, package_factory, remote_org, mocker):
+        dataset = package_factory()
+        profile = get_profiles(force_refresh=True)[0]
+        call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+        call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id)
+
+        record_success = mocker.patch("ckanext.syndicate.retry.CircuitBreaker.record_success")
+        result = call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id)
+        assert result["state"] == SyndicationLog.State.UNCHANGED
+        assert not record_success.called
+
+        call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id, force=True)
+        record_success.assert_called_once()
+
+    @pytest.mark.ckan_config("ckanext.syndicate.profile.test.sync_method", "patch")
+    def test_patch_changed_fields(self, ckan, package_factory, remote_org, mocker):
+        dataset = package_factory()
+        profile = get_profiles(force_refresh=True)[0]
+
+        result = call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+        call_action("package_patch", id=dataset["id"], notes="changed")
+
+        ckan.action.package_patch = mocker.Mock(return_value={"id": result["target_id"]})
+        call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id)
+
+        ckan.action.package_patch.assert_called_once()
+        changes = ckan.action.package_patch.call_args.kwargs
+        assert changes["id"] == result["target_id"]
+        assert changes["notes"] == "changed"
+        assert "resources" not in changes
+
+    @pytest.mark.ckan_config("ckanext.syndicate.profile.test.sync_method", "patch")
+    def test_patch_without_changes(self, ckan, package_factory, remote_org, mocker):
+        dataset = package_factory()
+        profile = get_profiles(force_refresh=True)[0]
+
+        result = call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+        call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id)
+
+        # payload is considered changed, but fields of the snapshot are the same
+        record = SyndicationLog.get(dataset["id"], profile.id)
+        assert record is not None
+        record.payload_hash = "outdated"
+        model.Session.commit()
+
+        ckan.action.package_patch = mocker.Mock()
+        ckan.action.package_update = mocker.Mock()
+        synced = call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id)
+
+        assert not ckan.action.package_patch.called
+        assert not ckan.action.package_update.called
+        assert synced["state"] == SyndicationLog.State.SYNCED
+        assert synced["target_id"] == result["target_id"]
+
+    @pytest.mark.ckan_config("ckanext.syndicate.profile.test.sync_method", "patch")
+    def test_forced_patch_sends_whole_package(self, ckan, package_factory, remote_org, mocker):
+        dataset = package_factory()
+        profile = get_profiles(force_refresh=True)[0]
+
+        result = call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+
+        ckan.action.package_patch = mocker.Mock()
+        ckan.action.package_update = mocker.Mock(return_value={"id": result["target_id"]})
+        forced = call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id, force=True)
+
+        assert not ckan.action.package_patch.called
+        ckan.action.package_update.assert_called_once()
+        assert ckan.action.package_update.call_args.kwargs["id"] == result["target_id"]
+        assert forced["state"] == SyndicationLog.State.SYNCED
+
+    @pytest.mark.ckan_config("ckanext.syndicate.profile.test.sync_resources", "true")
+    def test_incremental_resources(self, package_factory, remote_org):
+        dataset = package_factory(resources=[{"url": "http://a", "name": "a"}, {"url": "http://b", "name": "b"}])
+        profile = get_profiles(force_refresh=True)[0]
+
+        result = call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+        remote_ids = [res["id"] for res in call_action("package_show", id=result["target_id"])["resources"]]
+
+        call_action("resource_patch", id=dataset["resources"][0]["id"], name="changed")
+        call_action("resource_delete", id=dataset["resources"][1]["id"])
+        call_action("resource_create", package_id=dataset["id"], url="http://c", name="c")
+
+        call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id)
+
+        resources = call_action("package_show", id=result["target_id"])["resources"]
+        assert [res["name"] for res in resources] == ["changed", "c"]
+        assert resources[0]["id"] == remote_ids[0]
+
+        syndicate_log = SyndicationLog.get(dataset["id"], profile.id)
+        assert syndicate_log is not None
+        assert syndicate_log.resources is not None
+        assert len(syndicate_log.resources) == 2
+
+    @pytest.mark.usefixtures("clean_redis")
+    @pytest.mark.ckan_config("ckanext.syndicate.profile.test.circuit_threshold", "2")
+    def test_transient_failure_is_retried(self, ckan, package_factory, remote_org, mocker):
+        dataset = package_factory()
+        profile = get_profiles(force_refresh=True)[0]
+        ckan.action.package_create = mocker.Mock(side_effect=requests.Timeout("timeout"))
+
+        call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+        syndicate_log = SyndicationLog.get(dataset["id"], profile.id)
+        assert syndicate_log.state == SyndicationLog.State.FAILED
+        assert syndicate_log.attempts == 1
+        assert syndicate_log.retry_at is not None
+
+        call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+        assert ckan.action.package_create.call_count == 2
+
+        result = call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+        assert ckan.action.package_create.call_count == 2, "Circuit is open"
+        assert "Circuit" in result["error"]
+        assert SyndicationLog.get(dataset["id"], profile.id).attempts == 2
+
+    def test_permanent_failure_is_not_retried(self, ckan, package_factory, remote_org, mocker):
+        dataset = package_factory()
+        profile = get_profiles(force_refresh=True)[0]
+        ckan.action.package_create = mocker.Mock(side_effect=ckanapi.ValidationError({"name": ["taken"]}))
+
+        call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+
+        syndicate_log = SyndicationLog.get(dataset["id"], profile.id)
+        assert syndicate_log.state == SyndicationLog.State.FAILED
+        assert syndicate_log.retry_at is None
+
     def test_syndicate_existing_package_with_stale_syndicated_id(self, package_factory):
         profile = get_profiles(force_refresh=True)[0]
         stale = package_factory()
@@ -136,6 +285,46 @@ class TestSync:
         syndicated = call_action("package_show", id=syndicate_log.local_id)
         assert syndicated["notes"] == updated["notes"]
 
+    def test_optimistic_update(self, ckan, package_factory, remote_org, mocker):
+        dataset = package_factory()
+        profile = get_profiles(force_refresh=True)[0]
+        call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+        target_id = SyndicationLog.get(dataset["id"], profile.id).target_id
+
+        ckan.action.package_show = mocker.Mock(wraps=ckan.action.package_show)
+        call_action("package_patch", id=dataset["id"], notes="updated")
+        result = call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id)
+
+        assert result["state"] == SyndicationLog.State.SYNCED
+        assert result["target_id"] == target_id
+        assert not ckan.action.package_show.called
+        assert call_action("package_show", id=target_id)["notes"] == "updated"
+
+    def test_removed_remote_package_is_created_again(self, package_factory, remote_org):
+        dataset = package_factory()
+        profile = get_profiles(force_refresh=True)[0]
+        call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+        removed_id = SyndicationLog.get(dataset["id"], profile.id).target_id
+
+        call_action("dataset_purge", id=removed_id)
+        result = call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id)
+
+        assert result["state"] == SyndicationLog.State.SYNCED
+        assert result["target_id"] != removed_id
+        assert call_action("package_show", id=result["target_id"])["notes"] == dataset["notes"]
+
+    def test_deleted_package_is_not_created(self, ckan, package_factory, remote_org, mocker):
+        dataset = package_factory()
+        profile = get_profiles(force_refresh=True)[0]
+        assert SyndicationLog.get(dataset["id"], profile.id).target_id == "-"
+
+        ckan.action.package_create = mocker.Mock()
+        call_action("package_delete", id=dataset["id"])
+        result = call_action("syndicate_sync", id=dataset["id"], topic="update", profile=profile.id)
+
+        assert result["state"] == SyndicationLog.State.STOPPED
+        assert not ckan.action.package_create.called
+
     @pytest.mark.ckan_config("ckanext.syndicate.profile.test.replicate_organization", "yes")
     def test_organization_replication(self, ckan, user, organization_factory, package_factory, mocker):
         local_org = organization_factory(users=[{"capacity": "editor", "name": user["id"]}])
@@ -260,3 +449,42 @@ class TestSync:
         )
 
         assert not mock_org_update.called
+
+    @pytest.mark.ckan_config("ckanext.syndicate.profile.test.replicate_organization", "true")
+    def test_known_organization_is_reused(self, ckan, organization, package_factory, mocker):
+        dataset = package_factory(owner_org=organization["id"])
+        profile = get_profiles(force_refresh=True)[0]
+        utils.remember_remote_group(organization["id"], profile, organization["id"])
+
+        ckan.action.organization_show = mocker.Mock()
+        result = call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+
+        assert result["state"] == SyndicationLog.State.SYNCED
+        assert not ckan.action.organization_show.called
+        assert call_action("package_show", id=result["target_id"])["owner_org"] == organization["id"]
+
+    @pytest.mark.ckan_config("ckanext.syndicate.profile.test.replicate_organization", "true")
+    def test_rejected_organization_is_replicated_again(self, ckan, organization, package_factory, mocker):
+        dataset = package_factory(owner_org=organization["id"])
+        profile = get_profiles(force_refresh=True)[0]
+        utils.remember_remote_group(organization["id"], profile, "removed-remote-org")
+
+        ckan.action.organization_show = mocker.Mock(return_value=organization)
+        result = call_action("syndicate_sync", id=dataset["id"], topic="create", profile=profile.id)
+
+        assert result["state"] == SyndicationLog.State.SYNCED
+        ckan.action.organization_show.assert_called_once_with(id=organization["name"])
+        assert utils.get_remote_group(organization["id"], profile) == organization["id"]
+
+
+@pytest.mark.usefixtures("with_plugins")
+class TestPrepareGroupData:
+    def test_broken_image_is_not_uploaded(self, mocker):
+        profile = get_profiles(force_refresh=True)[0]
+        mocker.patch("ckanext.syndicate.images.fetch", side_effect=requests.HTTPError("404"))
+
+        group = prepare_group_data("local", {"name": "org", "image_display_url": "http://example.com/x.png"}, profile)
+
+        assert group["name"] == "org"
+        assert "image_upload" not in group
+        assert "image_display_url" not in group
@@ -0,0 +1,59 @@
+import pytest
+
+from ckanext.syndicate import bulk
+from ckanext.syndicate.model import SyndicationLog
+from ckanext.syndicate.types import Profile
+from ckanext.syndicate.utils import get_profiles
+
+
+class TestBackgroundSync:
+    def test_chunks(self, mocker):
+        enqueue = mocker.patch("ckanext.syndicate.bulk.tk.enqueue_job")
+        first, second = Profile(id="first"), Profile(id="second")
+
+        with bulk.BackgroundSync(batch_size=2) as queue:
+            for id_ in "abc":
+                queue.submit(id_, first)
+            queue.submit("d", second)
+
+        chunks = sorted(call.args[1][:2] for call in enqueue.call_args_list)
+        assert chunks == [[["a", "b"], "first"], [["c"], "first"], [["d"], "second"]]
+        assert queue.results == {("first", "queued"): 3, ("second", "queued"): 1}
+
+    @pytest.mark.ckan_config("ckan.jobs.timeout", "10")
+    def test_timeout_scales_with_chunk(self, mocker):
+        enqueue = mocker.patch("ckanext.syndicate.bulk.tk.enqueue_job")
+
+        with bulk.BackgroundSync(batch_size=3) as queue:
+            for id_ in "abc":
+                queue.submit(id_, Profile(id="test"))
+
+        assert enqueue.call_args.kwargs["rq_kwargs"] == {"timeout": 30}
+
+
+@pytest.mark.usefixtures("with_plugins", "clean_db", "clean_redis", "ckan")
+@pytest.mark.ckan_config("ckanext.syndicate.profile.test.name_prefix", "test")
+def test_sync_batch(package_factory):
+    profile = get_profiles(force_refresh=True)[0]
+    ids = [package_factory()["id"] for _ in range(3)]
+
+    results = bulk.sync_batch(ids, profile.id)
+
+    assert results == {SyndicationLog.State.SYNCED: 3}
+    for id_ in ids:
+        syndicate_log = SyndicationLog.get(id_, profile.id)
+        assert syndicate_log is not None
+        assert syndicate_log.state == SyndicationLog.State.SYNCED
+
+
+@pytest.mark.usefixtures("with_plugins", "clean_db", "clean_redis", "ckan")
+@pytest.mark.ckan_config("ckanext.syndicate.profile.test.name_prefix", "test")
+def test_sync_batch_writes_new_remote_id_immediately(package_factory, mocker):
+    profile = get_profiles(force_refresh=True)[0]
+    ids = [package_factory()["id"] for _ in range(2)]
+    bulk_write = mocker.spy(SyndicationLog, "bulk_write")
+
+    bulk.sync_batch(ids, profile.id)
+
+    # one flush per created package and the final flush of the empty buffer
+    assert [len(call.args[-1]) for call in bulk_write.call_args_list] == [1, 1, 0]
@@ -0,0 +1,80 @@
+import dataclasses
+
+import pytest
+
+from ckanext.syndicate import clients
+from ckanext.syndicate.throttle import ThrottledSession
+from ckanext.syndicate.types import Profile
+
+
+@pytest.fixture
+def profile():
+    return Profile(id="test", ckan_url="http://example.com", api_key="secret")
+
+
+@pytest.fixture(autouse=True)
+def clean_clients():
+    clients.reset_clients()
+    yield
+    clients.reset_clients()
+
+
+class TestGetClient:
+    def test_client_is_reused(self, profile):
+        client = clients.get_client(profile)
+
+        assert client is clients.get_client(dataclasses.replace(profile))
+        assert client.address == "http://example.com"
+        assert client.apikey == "secret"
+
+    def test_other_options_keep_client(self, profile):
+        client = clients.get_client(profile)
+
+        assert client is clients.get_client(dataclasses.replace(profile, name_prefix="changed"))
+
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {"id": "other"},
+            {"ckan_url": "http://other.example.com"},
+            {"api_key": "changed"},
+            {"user_agent": "changed"},
+            {"pool_size": 20},
+        ],
+    )
+    def test_connection_settings_invalidate_client(self, profile, changes):
+        client = clients.get_client(profile)
+
+        assert client is not clients.get_client(dataclasses.replace(profile, **changes))
+
+    @pytest.mark.usefixtures("clean_redis")
+    def test_rate_limit_invalidates_client(self, profile):
+        client = clients.get_client(profile)
+        throttled = clients.get_client(dataclasses.replace(profile, rate_limit=5))
+
+        assert throttled is not client
+        assert isinstance(throttled.session, ThrottledSession)
+        assert not isinstance(client.session, ThrottledSession)
+
+    def test_pool_size(self, profile):
+        client = clients.get_client(dataclasses.replace(profile, pool_size=3))
+
+        assert client.session.get_adapter("https://example.com")._pool_maxsize == 3
+
+    def test_reset(self, profile, mocker):
+        client = clients.get_client(profile)
+        close = mocker.spy(client.session, "close")
+
+        clients.reset_clients()
+
+        close.assert_called_once()
+        assert clients.get_client(profile) is not client
+
+    def test_forked_process_forgets_clients(self, profile, mocker):
+        client = clients.get_client(profile)
+        close = mocker.spy(client.session, "close")
+
+        clients._forget_inherited_clients()
+
+        assert clients.get_client(profile) is not client
+        assert not close.called, "Connections of the parent process must stay untouched"
@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+from ckanext.syndicate import engine
+from ckanext.syndicate.config import CONFIG_BATCH_SIZE
+from ckanext.syndicate.model import SyndicationLog
+from ckanext.syndicate.types import Profile
+from ckanext.syndicate.utils import get_profiles
+
+
+@pytest.mark.usefixtures("with_plugins", "clean_db", "clean_redis", "ckan", "with_request_context")
+@pytest.mark.ckan_config("ckanext.syndicate.profile.test.name_prefix", "test")
+@pytest.mark.ckan_config(CONFIG_BATCH_SIZE, "2")
+class TestSyndicationEngine:
+    def test_run(self, package_with_flag_factory, package_factory):
+        ids = [package_with_flag_factory()["id"] for _ in range(3)]
+        package_factory()
+        profile = get_profiles(force_refresh=True)[0]
+
+        results = engine.SyndicationEngine(sessions=2).run([profile])
+
+        assert results == {(profile.id, SyndicationLog.State.SYNCED): 3}
+        for id_ in ids:
+            syndicate_log = SyndicationLog.get(id_, profile.id)
+            assert syndicate_log is not None
+            assert syndicate_log.state == SyndicationLog.State.SYNCED
+
+    def test_sessions_are_bounded(self, package_with_flag_factory, mocker):
+        for _ in range(5):
+            package_with_flag_factory()
+
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def sync(package_id, profile, buffer, force=False):
+            with lock:
+                active.append(package_id)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.remove(package_id)
+            return SyndicationLog.State.SYNCED
+
+        mocker.patch("ckanext.syndicate.engine.bulk.sync_logged", side_effect=sync)
+        profiles = [Profile(id="first"), Profile(id="second"), Profile(id="third")]
+
+        results = engine.SyndicationEngine(sessions=2).run(profiles)
+
+        assert results == {(profile.id, SyndicationLog.State.SYNCED): 5 for profile in profiles}
+        assert max(peak) <= 2
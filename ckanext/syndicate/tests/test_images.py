@@ -0,0 +1,48 @@
+import pytest
+
+from ckanext.syndicate import images
+from ckanext.syndicate.config import CONFIG_IMAGE_CACHE_PATH
+
+IMAGE_URL = "http://example.com/logo.png"
+
+
+@pytest.fixture
+def image_cache(tmp_path, ckan_config, monkeypatch):
+    monkeypatch.setitem(ckan_config, CONFIG_IMAGE_CACHE_PATH, str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.usefixtures("image_cache")
+class TestFetch:
+    def test_download(self, mocker):
+        get = mocker.patch("ckanext.syndicate.images.requests.get")
+        get.return_value = mocker.Mock(status_code=200, content=b"image", headers={})
+
+        image = images.fetch(IMAGE_URL)
+
+        assert image.read() == b"image"
+        assert image.name == "logo.png"
+        get.assert_called_once_with(IMAGE_URL, headers={}, timeout=images.TIMEOUT)
+
+    def test_revalidation(self, mocker):
+        get = mocker.patch("ckanext.syndicate.images.requests.get")
+        get.return_value = mocker.Mock(status_code=200, content=b"image", headers={"ETag": '"v1"'})
+        first = images.fetch(IMAGE_URL)
+
+        get.return_value = mocker.Mock(status_code=304, headers={})
+        second = images.fetch(IMAGE_URL)
+
+        get.assert_called_with(IMAGE_URL, headers={"If-None-Match": '"v1"'}, timeout=images.TIMEOUT)
+        assert second.read() == b"image"
+        assert second.digest == first.digest
+
+    def test_changed_image(self, mocker):
+        get = mocker.patch("ckanext.syndicate.images.requests.get")
+        get.return_value = mocker.Mock(status_code=200, content=b"image", headers={"ETag": '"v1"'})
+        first = images.fetch(IMAGE_URL)
+
+        get.return_value = mocker.Mock(status_code=200, content=b"new image", headers={"ETag": '"v2"'})
+        second = images.fetch(IMAGE_URL)
+
+        assert second.read() == b"new image"
+        assert second.digest != first.digest
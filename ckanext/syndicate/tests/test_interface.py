@@ -47,6 +47,20 @@ class TestInterface:
         package_factory(extras=[{"key": "skip_me", "value": "True"}])
         syndicate.assert_not_called()
 
+    def test_all_skip_hooks_are_used(self, syndicate, package_factory: Callable[..., dict[str, Any]], mocker):
+        package_factory(extras=[{"key": "syndicate", "value": "true"}, {"key": "skip_me", "value": "True"}])
+        syndicate.assert_not_called()
+
+        package = package_factory(extras=[{"key": "syndicate", "value": "true"}])
+        syndicate.assert_called_with(package["id"], Topic.create, mocker.ANY)
+
+    def test_bulk_package_has_all_extras(self, package_factory: Callable[..., dict[str, Any]]):
+        package_factory(extras=[{"key": "syndicate", "value": "true"}, {"key": "skip_me", "value": "True"}])
+
+        stub = next(utils.iter_packages())
+        assert stub.extras == {"syndicate": "true", "skip_me": "True"}
+        assert not list(utils.profiles_for(stub))
+
     def test_custom_prepare_logic(self, package: dict[str, Any], mocker):
         profile = cast(Profile, utils.get_profile(TEST_PROFILE))
         profile.replicate_organization = False
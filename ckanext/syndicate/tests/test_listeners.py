@@ -5,7 +5,8 @@ import pytest
 
 from ckan.tests.helpers import call_action
 
-from ckanext.syndicate.config import CONFIG_SYNC_ON_CHANGES
+from ckanext.syndicate import utils
+from ckanext.syndicate.config import CONFIG_DEFERRED_CHANGES, CONFIG_SYNC_ON_CHANGES
 from ckanext.syndicate.types import Topic
 
 
@@ -41,6 +42,25 @@ class TestSyndicateOnPackageChangeListener:
         assert not syndicate.called
 
 
+@pytest.mark.usefixtures("with_plugins", "clean_db", "clean_redis")
+@pytest.mark.ckan_config(CONFIG_DEFERRED_CHANGES, True)
+class TestDeferredChanges:
+    def test_change_is_processed_in_background(self, syndicate, package_factory: Callable[..., dict[str, Any]], mocker):
+        enqueue = mocker.patch("ckanext.syndicate.utils.tk.enqueue_job")
+        mocker.patch("ckanext.syndicate.utils._is_pending", return_value=True)
+
+        dataset = package_factory(extras=[{"key": "syndicate", "value": "True"}])
+        call_action("package_patch", id=dataset["id"], title="Updated")
+
+        assert not syndicate.called
+        enqueue.assert_called_once()
+        job, args = enqueue.call_args.args[:2]
+        assert job is utils.sync_package_change
+
+        job(*args)
+        syndicate.assert_called_once_with(dataset["id"], Topic.update, mocker.ANY)
+
+
 @pytest.mark.usefixtures("with_plugins", "clean_db")
 class TestSyndicateOnResourceChangeListener:
     def test_syndicate_on_resource_create(self, syndicate, package_factory: Callable[..., dict[str, Any]], mocker):
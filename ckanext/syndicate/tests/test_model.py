@@ -2,9 +2,10 @@ from typing import Any
 
 import pytest
 
+from ckan import model
 from ckan.tests.helpers import call_action
 
-from ckanext.syndicate.model import SyndicationLog
+from ckanext.syndicate.model import LogBuffer, SyndicationGroupMap, SyndicationLog
 
 TEST_PROFILE = "test"
 
@@ -67,3 +68,99 @@ class TestSyndicationLogModel:
         call_action("dataset_purge", id=package["id"])
 
         assert SyndicationLog.get(package["id"], TEST_PROFILE) is None
+
+    def test_bulk_write(self, package_factory):
+        first, second = package_factory(), package_factory()
+        SyndicationLog.write(first["id"], TEST_PROFILE, target_id="remote-first", payload_hash="hash")
+
+        SyndicationLog.bulk_write(
+            [
+                {"local_id": first["id"], "profile_id": TEST_PROFILE, "state": SyndicationLog.State.FAILED},
+                {"local_id": second["id"], "profile_id": TEST_PROFILE, "target_id": "remote-second"},
+            ]
+        )
+        model.Session.expire_all()
+
+        log = SyndicationLog.get(first["id"], TEST_PROFILE)
+        assert log is not None
+        assert log.state == SyndicationLog.State.FAILED
+        assert log.target_id == "remote-first"
+        assert log.payload_hash == "hash"
+
+        log = SyndicationLog.get(second["id"], TEST_PROFILE)
+        assert log is not None
+        assert log.state == SyndicationLog.State.SYNCED
+        assert log.target_id == "remote-second"
+
+    def test_bulk_write_keeps_snapshot(self, package):
+        payload = {"name": package["name"]}
+        resources = {"local-res": {"id": "remote-res", "hash": "hash"}}
+        SyndicationLog.write(package["id"], TEST_PROFILE, "remote-id", payload=payload, resources=resources)
+
+        SyndicationLog.bulk_write(
+            [{"local_id": package["id"], "profile_id": TEST_PROFILE, "state": SyndicationLog.State.FAILED}]
+        )
+        model.Session.expire_all()
+
+        log = SyndicationLog.get(package["id"], TEST_PROFILE)
+        assert log is not None
+        assert log.state == SyndicationLog.State.FAILED
+        assert log.payload == payload
+        assert log.resources == resources
+
+    def test_log_buffer(self, package_factory):
+        ids = [package_factory()["id"] for _ in range(3)]
+        model.Session.query(SyndicationLog).delete()
+        model.Session.commit()
+
+        with LogBuffer(size=2) as buffer:
+            for id_ in ids:
+                buffer.add(local_id=id_, profile_id=TEST_PROFILE)
+
+            assert model.Session.query(SyndicationLog).count() == 2
+
+        assert model.Session.query(SyndicationLog).count() == 3
+
+    def test_preload(self, package_factory, mocker):
+        first, second = package_factory(), package_factory()
+        SyndicationLog.write(first["id"], "other", target_id="remote-first")
+
+        with SyndicationLog.preload([first["id"], second["id"]]):
+            query = mocker.spy(model.Session, "query")
+
+            assert SyndicationLog.get(first["id"], "other").target_id == "remote-first"
+            assert SyndicationLog.get(second["id"], "other") is None
+
+            SyndicationLog.write(second["id"], "other", target_id="remote-second")
+            assert SyndicationLog.get(second["id"], "other").target_id == "remote-second"
+
+            assert not query.called
+
+
+@pytest.mark.usefixtures("with_plugins", "clean_db")
+class TestSyndicationGroupMapModel:
+    def test_write(self, organization: dict[str, Any]):
+        SyndicationGroupMap.write(organization["id"], TEST_PROFILE, "remote-id", "hash")
+        SyndicationGroupMap.write(organization["id"], TEST_PROFILE, "new-remote-id")
+
+        record = SyndicationGroupMap.get(organization["id"], TEST_PROFILE)
+        assert record is not None
+        assert record.target_id == "new-remote-id"
+        assert record.image_hash == "hash"
+        assert SyndicationGroupMap.get(organization["id"], "other") is None
+
+    def test_delete(self, organization: dict[str, Any]):
+        SyndicationGroupMap.write(organization["id"], TEST_PROFILE, "remote-id")
+        SyndicationGroupMap.write(organization["id"], "other", "remote-id")
+
+        SyndicationGroupMap.delete(organization["id"], TEST_PROFILE)
+
+        assert SyndicationGroupMap.get(organization["id"], TEST_PROFILE) is None
+        assert SyndicationGroupMap.get(organization["id"], "other") is not None
+
+    def test_cascade_delete(self, organization: dict[str, Any]):
+        SyndicationGroupMap.write(organization["id"], TEST_PROFILE, "remote-id")
+
+        call_action("organization_purge", id=organization["id"])
+
+        assert SyndicationGroupMap.get(organization["id"], TEST_PROFILE) is None
@@ -0,0 +1,49 @@
+import pytest
+
+from ckanext.syndicate.config import CONFIG_PROFILE_RELOAD_INTERVAL
+from ckanext.syndicate.registry import ProfileRegistry
+
+
+class TestProfileRegistry:
+    def test_lookup(self):
+        registry = ProfileRegistry()
+
+        profile = registry.get("test")
+        assert profile is not None
+        assert profile.ckan_url == "http://example.com"
+        assert registry.get("missing") is None
+        assert [p.id for p in registry.all()] == ["test"]
+
+    def test_unchanged_profiles_are_kept(self):
+        registry = ProfileRegistry()
+        profile = registry.get("test")
+        version = registry.version("test")
+
+        assert not registry.reload()
+        assert registry.get("test") is profile
+        assert registry.version("test") == version
+
+    def test_changes_are_not_checked_by_default(self, ckan_config, monkeypatch):
+        registry = ProfileRegistry()
+        profile = registry.get("test")
+
+        monkeypatch.setitem(ckan_config, "ckanext.syndicate.profile.test.name_prefix", "changed")
+
+        assert registry.get("test") is profile
+
+    @pytest.mark.ckan_config(CONFIG_PROFILE_RELOAD_INTERVAL, "1")
+    def test_hot_reload(self, ckan_config, monkeypatch, mocker):
+        now = mocker.patch("ckanext.syndicate.registry.time.monotonic", return_value=1000)
+        registry = ProfileRegistry()
+        version = registry.version("test")
+
+        monkeypatch.setitem(ckan_config, "ckanext.syndicate.profile.test.name_prefix", "changed")
+        assert registry.get("test").name_prefix == ""
+
+        now.return_value = 1001
+        assert registry.get("test").name_prefix == "changed"
+        assert registry.version("test") != version
+
+        monkeypatch.setitem(ckan_config, "ckanext.syndicate.profile.another.ckan_url", "http://another.example.com")
+        now.return_value = 1002
+        assert registry.get("another") is not None
@@ -0,0 +1,66 @@
+import ckanapi
+import pytest
+import requests
+
+from ckanext.syndicate import retry
+from ckanext.syndicate.types import Profile
+
+
+def _http_error(status):
+    resp = requests.Response()
+    resp.status_code = status
+    return requests.HTTPError(response=resp)
+
+
+@pytest.mark.parametrize(
+    ("error", "transient"),
+    [
+        (requests.ConnectionError(), True),
+        (requests.Timeout(), True),
+        (_http_error(502), True),
+        (_http_error(429), True),
+        (_http_error(400), False),
+        (retry.CircuitOpenError("test", 10), True),
+        (ckanapi.ValidationError({}), False),
+        (ckanapi.NotAuthorized(), False),
+        (ckanapi.NotFound(), False),
+        (ValueError(), False),
+    ],
+)
+def test_is_transient(error, transient):
+    assert retry.is_transient(error) is transient
+
+
+def test_backoff_delay():
+    profile = Profile(id="test", retry_delay=10)
+
+    assert 5 <= retry.backoff_delay(profile, 1) <= 10
+    assert 40 <= retry.backoff_delay(profile, 3) <= 80
+
+
+@pytest.mark.usefixtures("clean_redis")
+class TestCircuitBreaker:
+    def test_open_after_threshold(self):
+        breaker = retry.CircuitBreaker(Profile(id="test", circuit_threshold=2, circuit_cooldown=60))
+
+        breaker.record_failure()
+        breaker.check()
+
+        breaker.record_failure()
+        with pytest.raises(retry.CircuitOpenError):
+            breaker.check()
+
+    def test_success_resets_failures(self):
+        breaker = retry.CircuitBreaker(Profile(id="test", circuit_threshold=2))
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert not breaker.open_for()
+
+    def test_disabled(self):
+        breaker = retry.CircuitBreaker(Profile(id="test", circuit_threshold=0))
+
+        breaker.record_failure()
+        assert not breaker.open_for()
@@ -0,0 +1,55 @@
+import pytest
+
+from ckan import model
+
+from ckanext.syndicate.model import SyndicationRun
+from ckanext.syndicate.runs import BulkRun
+from ckanext.syndicate.types import Profile
+
+
+@pytest.mark.usefixtures("with_plugins", "clean_db")
+class TestBulkRun:
+    def test_resume(self, package_factory):
+        ids = sorted(package_factory()["id"] for _ in range(3))
+        profile = Profile(id="test")
+        packages = model.Session.query(model.Package)
+
+        run = BulkRun.start([profile])
+        run.estimate(packages.count())
+
+        chunk = next(run.chunks(packages, size=2))
+        assert [pkg.id for pkg in chunk] == ids[:2]
+        run.checkpoint(chunk)
+
+        resumed = BulkRun.resume(run.id)
+        record = resumed.records[profile.id]
+        assert record.last_id == ids[1]
+        assert record.processed == 2
+        assert record.total == 3
+        assert record.eta is not None
+
+        assert not resumed.includes(profile, ids[0])
+        assert resumed.includes(profile, ids[2])
+
+        remaining = [pkg.id for chunk in resumed.chunks(packages, size=2) for pkg in chunk]
+        assert remaining == ids[2:]
+
+        resumed.finish()
+        assert SyndicationRun.get(run.id)[0].state == SyndicationRun.State.FINISHED
+        assert not list(resumed.chunks(packages))
+
+    def test_order_matches_python(self, package_factory):
+        # collation of the database may put lowercase IDs before uppercase
+        ids = sorted(package_factory(id=id_)["id"] for id_ in ["b-package", "B-package", "a-package", "A-package"])
+        profile = Profile(id="test")
+        packages = model.Session.query(model.Package).filter(model.Package.id.in_(ids))
+
+        run = BulkRun.start([profile])
+        chunk = next(run.chunks(packages, size=2))
+        assert [pkg.id for pkg in chunk] == ids[:2]
+        run.checkpoint(chunk)
+
+        resumed = BulkRun.resume(run.id)
+        remaining = [pkg.id for chunk in resumed.chunks(packages, size=2) for pkg in chunk]
+        assert remaining == ids[2:]
+        assert all(resumed.includes(profile, id_) for id_ in remaining)
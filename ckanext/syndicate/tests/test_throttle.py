@@ -0,0 +1,85 @@
+import pytest
+
+from ckan.exceptions import CkanConfigurationException
+
+from ckanext.syndicate import throttle
+from ckanext.syndicate.types import Profile
+
+
+@pytest.fixture
+def limiter():
+    return throttle.RateLimiter(Profile(id="test", rate_limit=10, rate_limit_burst=2, rate_limit_min=1))
+
+
+@pytest.mark.usefixtures("clean_redis")
+class TestRateLimiter:
+    def test_burst(self, limiter, mocker):
+        sleep = mocker.patch("ckanext.syndicate.throttle.time.sleep")
+
+        limiter.acquire()
+        limiter.acquire()
+        sleep.assert_not_called()
+
+        limiter.acquire()
+        sleep.assert_called_once()
+        assert 0 < sleep.call_args[0][0] <= 0.1
+
+    def test_backoff(self, limiter):
+        assert limiter.feedback(429, 0.1) == 5
+        assert limiter.feedback(503, 0.1) == 5, "Second failure within a second is ignored"
+
+    def test_min_rate(self, limiter, mocker):
+        now = mocker.patch("ckanext.syndicate.throttle.time.time")
+        for step in range(10):
+            now.return_value = 1000 + step * 2
+            rate = limiter.feedback(None, 0.1)
+
+        assert rate == 1
+
+    def test_recovery(self, limiter, mocker):
+        now = mocker.patch("ckanext.syndicate.throttle.time.time", return_value=1000)
+        limiter.feedback(429, 0.1)
+
+        now.return_value = 1001
+        assert limiter.feedback(200, throttle.LATENCY_TARGET + 1) == 5, "Slow responses do not speed up"
+        now.return_value = 1002
+        assert limiter.feedback(200, 0.1) == 6
+
+    def test_retry_after(self, limiter, mocker):
+        mocker.patch("ckanext.syndicate.throttle.time.time", return_value=1000)
+        sleep = mocker.patch("ckanext.syndicate.throttle.time.sleep")
+
+        limiter.feedback(429, 0.1, 30)
+        limiter.acquire()
+        sleep.assert_called_once_with(30)
+
+    def test_rate_never_drops_to_zero(self, mocker):
+        now = mocker.patch("ckanext.syndicate.throttle.time.time")
+        limiter = throttle.RateLimiter(Profile(id="test", rate_limit=1, rate_limit_min=0.000001))
+
+        for step in range(20):
+            now.return_value = 1000 + step * 2
+            rate = limiter.feedback(None, 0.1)
+
+        assert rate == throttle.MIN_RATE
+
+
+@pytest.mark.parametrize("value", [0, "0", -1])
+def test_min_rate_must_be_positive(value):
+    with pytest.raises(CkanConfigurationException):
+        Profile(id="test", rate_limit=10, rate_limit_min=value)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (None, 0),
+        ("", 0),
+        ("12", 12),
+        ("-1", 0),
+        ("invalid", 0),
+        ("Wed, 21 Oct 2015 07:28:00 GMT", 0),
+    ],
+)
+def test_parse_retry_after(value, expected):
+    assert throttle.parse_retry_after(value) == expected
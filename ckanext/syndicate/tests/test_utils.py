@@ -0,0 +1,282 @@
+from datetime import datetime as dt
+from datetime import timedelta as td
+from datetime import timezone as tz
+
+import pytest
+
+from ckan import model
+from ckan.plugins import PluginImplementations
+
+from ckanext.syndicate import registry, utils
+from ckanext.syndicate.config import CONFIG_DEBOUNCE, CONFIG_DROP_STALE_JOBS, CONFIG_GROUP_CACHE_TTL
+from ckanext.syndicate.interfaces import ISyndicate
+from ckanext.syndicate.model import SyndicationGroupMap, SyndicationLog
+from ckanext.syndicate.types import Profile, Topic
+
+
+@pytest.fixture
+def enqueue(mocker):
+    return mocker.patch("ckanext.syndicate.utils.tk.enqueue_job")
+
+
+@pytest.fixture
+def pending(mocker):
+    return mocker.patch("ckanext.syndicate.utils._is_pending", return_value=True)
+
+
+@pytest.mark.usefixtures("clean_redis", "pending")
+class TestSyndicateDataset:
+    def test_events_are_coalesced(self, enqueue):
+        profile = Profile(id="test")
+
+        utils.syndicate_dataset("pkg", Topic.create, profile)
+        utils.syndicate_dataset("pkg", Topic.update, profile)
+        utils.syndicate_dataset("other", Topic.update, profile)
+
+        assert enqueue.call_count == 2
+        assert enqueue.call_args_list[0].kwargs["rq_kwargs"]["job_id"].startswith("syndicate-test-pkg-")
+
+    def test_job_syncs_latest_topic(self, enqueue, mocker):
+        profile = Profile(id="test")
+        action = mocker.patch("ckanext.syndicate.utils.tk.get_action")
+
+        utils.syndicate_dataset("pkg", Topic.create, profile)
+        utils.syndicate_dataset("pkg", Topic.update, profile, force=True)
+        utils.sync_package("pkg", Topic.create, profile)
+
+        data = action.return_value.call_args.args[1]
+        assert data["topic"] == Topic.update.name
+        assert data["force"]
+
+        utils.syndicate_dataset("pkg", Topic.update, profile)
+        assert enqueue.call_count == 2, "Job is enqueued again after the start of the previous one"
+
+        first, second = (call.kwargs["rq_kwargs"]["job_id"] for call in enqueue.call_args_list)
+        assert first != second, "New job does not reuse ID of the running one"
+
+    def test_lost_job_is_enqueued_again(self, enqueue, pending):
+        profile = Profile(id="test")
+
+        utils.syndicate_dataset("pkg", Topic.update, profile)
+        pending.return_value = False
+        utils.syndicate_dataset("pkg", Topic.update, profile)
+
+        assert enqueue.call_count == 2
+
+    def test_fanout(self, enqueue):
+        profiles = [Profile(id="first"), Profile(id="second"), Profile(id="third", queue="other")]
+
+        utils.syndicate_dataset_to_profiles("pkg", Topic.update, profiles)
+        utils.syndicate_dataset_to_profiles("pkg", Topic.update, profiles)
+
+        assert enqueue.call_count == 2
+        single, fanout = sorted(enqueue.call_args_list, key=lambda call: call.args[0].__name__)
+        assert single.args[:2] == (utils.sync_package, ["pkg", "update", "third", None])
+        assert fanout.args[:2] == (utils.sync_package_to_profiles, ["pkg", "update", ["first", "second"]])
+
+    def test_job_carries_profile_version(self, enqueue, mocker):
+        profile = utils.get_profile("test")
+        action = mocker.patch("ckanext.syndicate.utils.tk.get_action")
+
+        utils.syndicate_dataset("pkg", Topic.update, profile)
+        args = enqueue.call_args.args[1]
+        assert args == ["pkg", "update", "test", registry.profiles.version("test")]
+
+        utils.sync_package(*args)
+        assert action.return_value.call_args.args[1]["profile"] == "test"
+
+    @pytest.mark.ckan_config(CONFIG_DEBOUNCE, "10")
+    @pytest.mark.ckan_config("ckan.jobs.timeout", "60")
+    def test_debounce(self, enqueue, mocker):
+        profile = Profile(id="test")
+        now = mocker.patch("ckanext.syndicate.utils.time.time", return_value=1000)
+        sleep = mocker.patch("ckanext.syndicate.utils.time.sleep")
+
+        utils.syndicate_dataset("pkg", Topic.update, profile)
+        assert enqueue.call_args.kwargs["rq_kwargs"]["timeout"] == 70
+
+        now.return_value = 1004
+        utils.syndicate_dataset("pkg", Topic.update, profile)
+
+        # package keeps changing while the job waits
+        def change(delay):
+            now.return_value += delay
+            utils.syndicate_dataset("pkg", Topic.update, profile)
+
+        now.return_value = 1005
+        sleep.side_effect = change
+        assert utils._claim_pending(utils._job_id("pkg", profile.id))
+
+        assert [call.args[0] for call in sleep.call_args_list] == [9, 1]
+        assert now.return_value == 1015, "Job waits no longer than one window"
+
+    @pytest.mark.ckan_config(CONFIG_DROP_STALE_JOBS, "true")
+    def test_stale_job_is_dropped(self, mocker):
+        action = mocker.patch("ckanext.syndicate.utils.tk.get_action")
+
+        assert utils.sync_package("pkg", "update", "test", "outdated-version") == {}
+        action.assert_not_called()
+
+
+@pytest.mark.usefixtures("with_plugins", "clean_db")
+class TestOutdatedPackages:
+    def test_selection(self, package_factory):
+        never_synced = package_factory()
+        synced = package_factory()
+        modified = package_factory()
+        # forget STOPPED records created by listeners
+        model.Session.query(SyndicationLog).delete()
+
+        SyndicationLog.write(synced["id"], "test", "remote-synced")
+        record = SyndicationLog.write(modified["id"], "test", "remote-modified", defer_commit=True)
+        record.timestamp = dt.now(tz=tz.utc) - td(days=1)
+        model.Session.commit()
+
+        ids = {pkg.id for pkg in utils.outdated_packages("test")}
+        assert ids == {never_synced["id"], modified["id"]}
+
+        ids = {pkg.id for pkg in utils.outdated_packages("other")}
+        assert ids == {never_synced["id"], synced["id"], modified["id"]}
+
+
+@pytest.mark.usefixtures("with_plugins", "clean_db")
+class TestCandidatePackages:
+    def test_default_rules(self, package_factory, package_with_flag_factory, organization):
+        flagged = package_with_flag_factory(owner_org=organization["id"])
+        package_with_flag_factory(private=True, owner_org=organization["id"])
+        package_factory()
+        deleted = package_factory()
+        model.Package.get(deleted["id"]).state = "deleted"
+        model.Session.commit()
+
+        assert {pkg.id for pkg in utils.candidate_packages(Profile(id="test"))} == {flagged["id"]}
+
+        SyndicationLog.write(deleted["id"], "test", "remote-deleted")
+        ids = {pkg.id for pkg in utils.candidate_packages(Profile(id="test"))}
+        assert ids == {flagged["id"], deleted["id"]}
+
+    def test_filters(self, package_with_flag_factory, organization):
+        matching = package_with_flag_factory(owner_org=organization["id"], tags=[{"name": "open"}])
+        other_org = package_with_flag_factory(tags=[{"name": "open"}])
+        other_tag = package_with_flag_factory(owner_org=organization["id"], tags=[{"name": "closed"}])
+        profile = Profile(id="test", filter_organizations=organization["name"], filter_tags="open hdx")
+
+        assert {pkg.id for pkg in utils.candidate_packages(profile)} == {matching["id"]}
+
+        skipper = next(iter(PluginImplementations(ISyndicate)))
+        assert not skipper.skip_syndication(model.Package.get(matching["id"]), profile)
+        assert skipper.skip_syndication(model.Package.get(other_org["id"]), profile)
+        assert skipper.skip_syndication(model.Package.get(other_tag["id"]), profile)
+
+        profile.filter_types = ["showcase"]
+        assert not utils.candidate_packages(profile).count()
+
+    def test_matches_python_rules(self, package_factory, package_with_flag_factory):
+        for _ in range(3):
+            package_factory()
+            package_with_flag_factory()
+
+        expected = {pkg.id for pkg in utils.iter_packages() if list(utils.profiles_for(pkg))}
+        assert {pkg.id for pkg in utils.profile_packages(utils.get_profile("test"))} == expected
+
+
+@pytest.mark.usefixtures("with_plugins", "clean_db")
+class TestProfilesFor:
+    def test_stopped_state_is_not_rewritten(self, package):
+        record = SyndicationLog.get(package["id"], "test")
+        assert record is not None
+        assert record.state == SyndicationLog.State.STOPPED
+        timestamp = record.timestamp
+
+        assert not list(utils.profiles_for(model.Package.get(package["id"])))
+        model.Session.commit()
+        model.Session.expire_all()
+
+        assert SyndicationLog.get(package["id"], "test").timestamp == timestamp
+
+    def test_state_change_is_recorded(self, package):
+        SyndicationLog.write(package["id"], "test", "remote-id")
+
+        list(utils.profiles_for(model.Package.get(package["id"])))
+        model.Session.commit()
+
+        record = SyndicationLog.get(package["id"], "test")
+        assert record.state == SyndicationLog.State.STOPPED
+        assert record.target_id == "remote-id"
+
+    @pytest.mark.ckan_config("ckanext.syndicate.log_unsyndicated", "false")
+    def test_unsyndicated_are_not_recorded(self, package):
+        assert SyndicationLog.get(package["id"], "test") is None
+
+    def test_decisions_are_cached(self, package, mocker):
+        reason = mocker.spy(utils, "_skip_reason")
+        pkg = model.Package.get(package["id"])
+
+        with utils.cached_skip_decisions():
+            assert not list(utils.profiles_for(pkg))
+            assert not list(utils.profiles_for(pkg))
+
+        assert reason.call_count == len(utils.get_profiles())
+
+
+@pytest.mark.usefixtures("with_plugins", "clean_db")
+class TestPackageChunks:
+    def test_chunks(self, package_factory, package_with_flag_factory):
+        ids = sorted([package_factory()["id"], package_factory()["id"], package_with_flag_factory()["id"]])
+
+        chunks = list(utils.package_chunks(size=2))
+
+        assert [[pkg.id for pkg in chunk] for chunk in chunks] == [ids[:2], ids[2:]]
+        flagged = {pkg.id: pkg.extras for chunk in chunks for pkg in chunk}
+        assert sorted(extras.get("syndicate") for extras in flagged.values() if extras) == ["true"]
+
+    def test_stub_fallback(self, package):
+        stub = next(utils.iter_packages())
+
+        assert stub.id == package["id"]
+        assert stub.title == package["title"]
+
+
+@pytest.mark.usefixtures("with_plugins", "clean_db")
+class TestRemoteGroup:
+    def test_unknown_group(self, organization):
+        assert utils.get_remote_group(organization["id"], Profile(id="test")) is None
+
+    def test_group_is_cached(self, organization, mocker):
+        profile = Profile(id="test")
+        utils.remember_remote_group(organization["id"], profile, "remote-id")
+
+        query = mocker.spy(model.Session, "query")
+        assert utils.get_remote_group(organization["id"], profile) == "remote-id"
+        assert not query.called
+
+    def test_expiration(self, organization, mocker):
+        profile = Profile(id="test", update_organization=True)
+        utils.remember_remote_group(organization["id"], profile, "remote-id")
+        mocker.patch.object(utils, "_remote_groups", {})
+
+        record = SyndicationGroupMap.get(organization["id"], profile.id)
+        assert record is not None
+        record.timestamp = dt.now(tz=tz.utc) - td(days=1)
+        model.Session.commit()
+
+        assert utils.get_remote_group(organization["id"], profile) is None
+
+        profile.update_organization = False
+        assert utils.get_remote_group(organization["id"], profile) == "remote-id"
+
+    @pytest.mark.ckan_config(CONFIG_GROUP_CACHE_TTL, "0")
+    def test_disabled_cache(self, organization):
+        profile = Profile(id="test")
+        utils.remember_remote_group(organization["id"], profile, "remote-id")
+
+        assert utils.get_remote_group(organization["id"], profile) is None
+
+    def test_forget(self, organization):
+        profile = Profile(id="test")
+        utils.remember_remote_group(organization["id"], profile, "remote-id")
+
+        utils.forget_remote_group(organization["id"], profile)
+
+        assert utils.get_remote_group(organization["id"], profile) is None
+        assert SyndicationGroupMap.get(organization["id"], profile.id) is None
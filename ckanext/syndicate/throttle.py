@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime as dt
+from datetime import timezone as tz
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any
+
+import requests
+
+import ckan.plugins.toolkit as tk
+from ckan.lib.redis import connect_to_redis
+
+if TYPE_CHECKING:
+    from ckanext.syndicate.types import Profile
+
+log = logging.getLogger(__name__)
+
+# responses slower than this value do not speed up the rate
+LATENCY_TARGET = 2.0
+# multiplicative decrease on throttling and additive increase per second
+DECREASE_FACTOR = 0.5
+INCREASE_SHARE = 0.1
+BUCKET_TTL = 3600
+# lowest rate ever used: requests must not stop completely
+MIN_RATE = 0.01
+
+# Reserve a token and return the number of seconds to wait before request.
+# Tokens may go below zero: every waiting client holds its own reservation.
+_ACQUIRE = """
+local max_rate = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local now = tonumber(ARGV[1])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'rate', 'blocked_until')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+local rate = tonumber(state[3]) or max_rate
+local blocked = tonumber(state[4]) or 0
+
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate) - 1
+local wait = 0
+if tokens < 0 then
+  wait = -tokens / rate
+end
+if blocked > now + wait then
+  wait = blocked - now
+end
+
+redis.call('HMSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now), 'rate', tostring(rate))
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return tostring(wait)
+"""
+
+# Adjust rate using AIMD: halve it when remote portal throttles requests and
+# increase linearly while remote portal responds fast.
+_FEEDBACK = """
+local now = tonumber(ARGV[1])
+local max_rate = tonumber(ARGV[2])
+local min_rate = tonumber(ARGV[3])
+local throttled = ARGV[4] == '1'
+local healthy = ARGV[5] == '1'
+local retry_after = tonumber(ARGV[6])
+local state = redis.call('HMGET', KEYS[1], 'rate', 'changed', 'blocked_until')
+local rate = tonumber(state[1]) or max_rate
+local changed = tonumber(state[2]) or now
+local blocked = tonumber(state[3]) or 0
+
+if throttled then
+  -- one decrease per second: simultaneous failures report the same problem
+  if now - changed >= 1 or rate >= max_rate then
+    rate = math.max(min_rate, rate * tonumber(ARGV[7]))
+    changed = now
+  end
+  if retry_after > 0 then
+    blocked = math.max(blocked, now + retry_after)
+  end
+elseif healthy then
+  rate = math.min(max_rate, rate + max_rate * tonumber(ARGV[8]) * math.min(1, now - changed))
+  changed = now
+end
+
+redis.call('HMSET', KEYS[1], 'rate', tostring(rate), 'changed', tostring(changed), 'blocked_until', tostring(blocked))
+redis.call('EXPIRE', KEYS[1], ARGV[9])
+return tostring(rate)
+"""
+
+
+class RateLimiter:
+    """Adaptive token bucket shared by all processes through Redis.
+
+    Bucket starts with the `rate_limit` requests per second configured for the
+    profile. Rate is reduced when remote portal answers with 429 or 5xx
+    status(requests are paused completely for `Retry-After` seconds) and
+    restored gradually while remote portal responds within `LATENCY_TARGET`.
+    """
+
+    def __init__(self, profile: Profile):
+        self.max_rate = profile.rate_limit
+        self.min_rate = min(max(profile.rate_limit_min, MIN_RATE), profile.rate_limit)
+        self.burst = max(1, profile.rate_limit_burst)
+        self.key = "{}:syndicate:rate_limit:{}".format(tk.config["ckan.site_id"], profile.id)
+
+        conn = connect_to_redis()
+        self._acquire = conn.register_script(_ACQUIRE)
+        self._feedback = conn.register_script(_FEEDBACK)
+
+    def acquire(self) -> None:
+        """Wait until the request can be sent."""
+        wait = float(self._acquire([self.key], [time.time(), self.max_rate, self.burst, BUCKET_TTL]))
+        if wait > 0:
+            log.debug("Rate limit %s: waiting %.2f seconds", self.key, wait)
+            time.sleep(wait)
+
+    def feedback(self, status: int | None, latency: float, retry_after: float = 0) -> float:
+        """Adjust rate according to the response of remote portal.
+
+        `None` status means that request failed without response.
+        """
+        throttled = status is None or status == requests.codes.too_many_requests or status >= 500  # noqa: PLR2004
+        healthy = not throttled and latency <= LATENCY_TARGET
+
+        return float(
+            self._feedback(
+                [self.key],
+                [
+                    time.time(),
+                    self.max_rate,
+                    self.min_rate,
+                    int(throttled),
+                    int(healthy),
+                    retry_after,
+                    DECREASE_FACTOR,
+                    INCREASE_SHARE,
+                    BUCKET_TTL,
+                ],
+            )
+        )
+
+
+class ThrottledSession(requests.Session):
+    """HTTP session that respects the rate limit of the remote portal."""
+
+    def __init__(self, limiter: RateLimiter):
+        super().__init__()
+        self.limiter = limiter
+
+    def request(self, *args: Any, **kwargs: Any) -> requests.Response:  # type: ignore
+        self.limiter.acquire()
+        start = time.monotonic()
+
+        try:
+            resp = super().request(*args, **kwargs)
+        except requests.RequestException as e:
+            # error responses may be raised by response hooks
+            self._feedback(e.response, start)
+            raise
+
+        self._feedback(resp, start)
+        return resp
+
+    def _feedback(self, resp: requests.Response | None, start: float) -> None:
+        latency = time.monotonic() - start
+        if resp is None:
+            self.limiter.feedback(None, latency)
+        else:
+            self.limiter.feedback(resp.status_code, latency, parse_retry_after(resp.headers.get("Retry-After")))
+
+
+def parse_retry_after(value: str | None) -> float:
+    """Convert value of Retry-After header into number of seconds."""
+    if not value:
+        return 0
+
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=tz.utc)
+
+    return max(0, (date - dt.now(tz=tz.utc)).total_seconds())
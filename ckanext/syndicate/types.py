@@ -6,8 +6,11 @@ import enum
 import ckanapi
 
 import ckan.plugins.toolkit as tk
+from ckan.exceptions import CkanConfigurationException
 from ckan.lib.jobs import DEFAULT_QUEUE_NAME
 
+from ckanext.syndicate import clients
+
 
 class Topic(enum.Enum):
     create = enum.auto()
@@ -28,27 +31,40 @@ class Profile:
     replicate_organization: bool = False
     update_organization: bool = False
     refresh_package_name: bool = False
+    optimistic_update: bool = True
+    sync_method: str = "update"
+    sync_resources: bool = False
     user_agent: str | None = None
     upload_organization_image: bool = True
     queue: str = DEFAULT_QUEUE_NAME
+    pool_size: int = 10
+    rate_limit: float = 0
+    rate_limit_burst: int = 5
+    rate_limit_min: float = 0.1
+    max_retries: int = 5
+    retry_delay: int = 30
+    circuit_threshold: int = 5
+    circuit_cooldown: int = 60
+    filter_organizations: list[str] = dataclasses.field(default_factory=list)
+    filter_types: list[str] = dataclasses.field(default_factory=list)
+    filter_tags: list[str] = dataclasses.field(default_factory=list)
 
     # TODO: deletee this field in future releases
     author: str = ""
 
     def __post_init__(self):
-        flags = [
-            "replicate_organization",
-            "update_organization",
-            "upload_organization_image",
-        ]
-
-        for flag in flags:
-            value = getattr(self, flag)
-            if not isinstance(value, bool):
-                setattr(self, flag, tk.asbool(value))
-
-    def get_target(self):
-        ckan = ckanapi.RemoteCKAN(self.ckan_url, apikey=self.api_key)
-        if self.user_agent is not None:
-            ckan.user_agent = self.user_agent
-        return ckan
+        # values from the config file are always strings
+        converters = {"bool": tk.asbool, "int": tk.asint, "float": float, "list[str]": tk.aslist}
+
+        for field in dataclasses.fields(self):
+            convert = converters.get(str(field.type))
+            value = getattr(self, field.name)
+            if convert and isinstance(value, str):
+                setattr(self, field.name, convert(value))
+
+        if self.rate_limit_min <= 0:
+            msg = f"rate_limit_min of syndication profile {self.id} must be positive"
+            raise CkanConfigurationException(msg)
+
+    def get_target(self) -> ckanapi.RemoteCKAN:
+        return clients.get_client(self)
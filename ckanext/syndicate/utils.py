@@ -1,127 +1,834 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-from collections import defaultdict
+import time
+import uuid
+from collections import Counter, defaultdict
 from collections.abc import Iterator
-from functools import lru_cache
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime as dt
+from datetime import timedelta as td
+from datetime import timezone as tz
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Query, aliased
 
 import ckan.plugins.toolkit as tk
 from ckan import model
+from ckan.lib import jobs
+from ckan.lib.redis import connect_to_redis
 from ckan.plugins import PluginImplementations
 
+from ckanext.syndicate import bulk, config, registry, retry
 from ckanext.syndicate.interfaces import ISyndicate
-from ckanext.syndicate.model import SyndicationLog
+from ckanext.syndicate.model import SyndicationGroupMap, SyndicationLog
 from ckanext.syndicate.types import Profile, Topic
 
-PROFILE_PREFIX = "ckanext.syndicate.profile."
+PROFILE_PREFIX = registry.PROFILE_PREFIX
+# pending syndication is forgotten if its job was not started during this time
+PENDING_TTL = 24 * 60 * 60
+PENDING_JOB_STATUSES = ("queued", "started", "deferred", "scheduled")
+# values of syndication flag accepted by `tk.asbool`
+FLAG_TRUE_VALUES = ("true", "yes", "on", "y", "t", "1")
 log = logging.getLogger(__name__)
 
+# package IDs are compared bytewise, the same way as strings in Python
+_package_key = model.Package.id.collate("C")
+
+# (profile ID, local group ID) -> (remote group ID, expiration time)
+_remote_groups: dict[tuple[str, str], tuple[str, float]] = {}
+
 
-def syndicate_dataset(package_id: str, topic: Topic, profile: Profile):
+def syndicate_dataset(package_id: str, topic: Topic, profile: Profile, force: bool = False):
     """Enqueue syndication job.
 
+    While the job for the package and profile is waiting in the queue, new
+    calls do not enqueue more jobs. Instead, they update the topic of the
+    pending syndication and the queued job syncs the latest state of the
+    package once.
+
     If you need realtime syndication, use `syndicate_sync` action.
     """
-    tk.enqueue_job(sync_package, [package_id, topic, profile], queue=profile.queue)
+    job_id = _job_id(package_id, profile.id)
+    if not _mark_pending(job_id, topic, force):
+        log.debug("Syndication of %s to %s is already queued", package_id, profile.id)
+        return
+
+    tk.enqueue_job(
+        sync_package,
+        [package_id, topic.name, profile.id, registry.profiles.version(profile.id)],
+        {"force": force},
+        queue=profile.queue,
+        rq_kwargs={"job_id": _assign_job(job_id), "timeout": _debounced_job_timeout()},
+    )
+
+
+def syndicate_dataset_to_profiles(package_id: str, topic: Topic, profiles: list[Profile], force: bool = False):
+    """Enqueue syndication of the package to several profiles.
+
+    Profiles that share a queue are served by a single fan-out job, that reads
+    the local package once and pushes it to every profile. Pending fan-out
+    job is coalesced with further calls just as the job of
+    `syndicate_dataset`.
+    """
+    by_queue: dict[str, list[Profile]] = defaultdict(list)
+    for profile in profiles:
+        by_queue[profile.queue].append(profile)
+
+    for queue, group in by_queue.items():
+        if len(group) == 1:
+            syndicate_dataset(package_id, topic, group[0], force)
+            continue
+
+        profile_ids = [p.id for p in group]
+        job_id = _job_id(package_id, f"fanout:{queue}")
+        if not _mark_pending(job_id, topic, force, profile_ids):
+            log.debug("Syndication of %s to %s is already queued", package_id, profile_ids)
+            continue
+
+        tk.enqueue_job(
+            sync_package_to_profiles,
+            [package_id, topic.name, profile_ids],
+            {"force": force, "queue": queue, "versions": {id_: registry.profiles.version(id_) for id_ in profile_ids}},
+            queue=queue,
+            rq_kwargs={"job_id": _assign_job(job_id), "timeout": _debounced_job_timeout()},
+        )
+
+
+def enqueue_package_change(package_id: str, topic: Topic) -> None:
+    """Enqueue processing of the modified package.
+
+    The job decides which profiles are applicable and enqueues syndication.
+    Changes made while the job is queued are processed by the same job.
+    """
+    job_id = _job_id(package_id, "change")
+    if not _mark_pending(job_id, topic, False):
+        return
+
+    tk.enqueue_job(
+        sync_package_change,
+        [package_id, topic.name],
+        queue=config.get_queue_name(),
+        rq_kwargs={"job_id": _assign_job(job_id)},
+    )
+
+
+def sync_package_change(package_id: str, topic: Topic | str) -> None:
+    """Background job that processes the modified package."""
+    if pending := _claim_pending(_job_id(package_id, "change"), wait=False):
+        topic = pending["topic"]
+
+    if isinstance(topic, str):
+        topic = Topic[topic]
+
+    syndicate_package_change(package_id, topic)
+
+
+def syndicate_package_change(package_id: str, topic: Topic) -> None:
+    """Enqueue syndication of the modified package to applicable profiles."""
+    package = model.Package.get(package_id)
+    if not package:
+        return
+
+    profiles = list(profiles_for(package))
+    for profile in profiles:
+        log.debug("Syndicate on change triggered for <%s> to %s", package.id, profile.ckan_url)
+
+    # fan-out job reads the package once for all profiles
+    if len(profiles) > 1:
+        syndicate_dataset_to_profiles(package.id, topic, profiles)
+    else:
+        for profile in profiles:
+            syndicate_dataset(package.id, topic, profile)
+
+    model.Session.commit()
+
+
+def _job_id(package_id: str, target: str) -> str:
+    return f"syndicate-{target}-{package_id}"
+
+
+def _pending_key(job_id: str) -> str:
+    return "{}:syndicate:pending:{}".format(tk.config["ckan.site_id"], job_id)
+
+
+def _mark_pending(job_id: str, topic: Topic, force: bool, profile_ids: list[str] | None = None) -> bool:
+    """Record details of requested syndication.
+
+    Returns `True` if no queued job serves the pending syndication and a new
+    job must be enqueued.
+    """
+    key = _pending_key(job_id)
+    now = time.time()
+
+    with connect_to_redis().pipeline() as pipe:
+        pipe.hget(key, "job")
+        pipe.hsetnx(key, "queued", now)
+        pipe.hset(key, "topic", topic.name)
+        pipe.hset(key, "updated", now)
+        if force:
+            pipe.hset(key, "force", 1)
+        if profile_ids is not None:
+            pipe.hset(key, "profiles", ",".join(profile_ids))
+        pipe.expire(key, PENDING_TTL + config.get_debounce())
+        queued, *_ = pipe.execute()
+
+    return not queued or not _is_pending(queued.decode())
+
+
+def _assign_job(job_id: str) -> str:
+    """Generate ID of the new job for the pending syndication.
+
+    Job that already claimed the pending syndication may still be running.
+    Every job gets a unique ID, so that RQ does not mix it with the running
+    one.
+    """
+    rq_id = f"{job_id}-{uuid.uuid4().hex[:8]}"
+    connect_to_redis().hset(_pending_key(job_id), "job", rq_id)
+    return rq_id
+
+
+def _is_pending(job_id: str) -> bool:
+    try:
+        job = jobs.job_from_id(job_id)
+    except KeyError:
+        return False
+
+    return job.get_status() in PENDING_JOB_STATUSES
+
+
+def _debounced_job_timeout() -> int:
+    """Timeout of the job that waits for the end of debounce window."""
+    return config.get_job_timeout() + config.get_debounce()
+
+
+def _claim_pending(job_id: str, wait: bool = True) -> dict[str, str]:
+    """Wait for the end of debounce window and take the pending syndication.
+
+    Every change of the package extends the window, but the job never waits
+    longer than one window in total, so that frequently modified packages
+    are synchronized as well.
+
+    Returns details of the latest syndication request. Requests made after
+    this point enqueue a new job.
+    """
+    key = _pending_key(job_id)
+    conn = connect_to_redis()
+    window = config.get_debounce() if wait else 0
+    deadline = time.time() + window
+
+    while window > 0 and (updated := conn.hget(key, "updated")):
+        delay = min(float(updated) + window, deadline) - time.time()
+        if delay <= 0:
+            break
+        time.sleep(delay)
+
+    with conn.pipeline() as pipe:
+        pipe.hgetall(key)
+        pipe.delete(key)
+        pending, _ = pipe.execute()
+
+    return {k.decode(): v.decode() for k, v in pending.items()}
 
 
-def sync_all_profiles(foreground: bool = False) -> None:
-    packages = model.Session.query(model.Package)
+def sync_all_profiles(foreground: bool = False, workers: int = 1, since: bool = False) -> Counter[tuple[str, str]]:
+    """Syndicate all packages to all applicable profiles.
+
+    In foreground mode, packages are syndicated by `workers` threads per
+    profile and the number of outcomes per `(profile ID, state)` is returned.
+    Otherwise, packages are enqueued in chunks of
+    `ckanext.syndicate.batch_size`.
+
+    With `since`, only packages modified after their last syndication to the
+    profile are syndicated.
+    """
     profiles = list(get_profiles())
+    replicated = set()
 
-    log.info("Syncing %s packages to %s profiles", packages.count(), len(profiles))
+    with _bulk_sync(foreground, workers) as pool, cached_skip_decisions():
+        if since or is_default_skip_policy():
+            for profile in profiles:
+                _sync_selection(pool, profile, replicated, since)
+            return pool.results
 
-    for package in packages:
-        for profile in profiles_for(package):
-            if foreground:
-                sync_package(package.id, Topic.update, profile)
-            else:
-                syndicate_dataset(package.id, Topic.update, profile)
+        packages = model.Session.query(model.Package)
+        log.info("Syncing %s packages to %s profiles", packages.count(), len(profiles))
 
+        for package in iter_packages(packages):
+            for profile in profiles_for(package):
+                replicate_organization_once(package.owner_org, profile, replicated)
+                pool.submit(package.id, profile)
 
-def sync_profile(profile_id: str, foreground: bool = False) -> None:
+    return pool.results
+
+
+def sync_profile(
+    profile_id: str,
+    foreground: bool = False,
+    workers: int = 1,
+    since: bool = False,
+) -> Counter[tuple[str, str]]:
+    """Syndicate all applicable packages to the profile."""
     profile = get_profile(profile_id)
 
     if not profile:
         log.error("Profile %s not found", profile_id)
-        return
+        return Counter()
+
+    with _bulk_sync(foreground, workers) as pool, cached_skip_decisions():
+        _sync_selection(pool, profile, set(), since)
+
+    return pool.results
+
+
+def outdated_packages(profile_id: str, packages: Query[model.Package] | None = None) -> Query[model.Package]:
+    """Select packages that were modified after the last syndication.
+
+    Packages that were never syndicated to the profile are selected as well.
+    `packages` can be used to narrow down the selection.
+    """
+    if packages is None:
+        packages = model.Session.query(model.Package)
+
+    return packages.outerjoin(
+        SyndicationLog,
+        sa.and_(SyndicationLog.local_id == model.Package.id, SyndicationLog.profile_id == profile_id),
+    ).filter(
+        # metadata_modified is a naive UTC timestamp
+        sa.or_(
+            SyndicationLog.local_id.is_(None),
+            model.Package.metadata_modified > sa.func.timezone("UTC", SyndicationLog.timestamp),
+        )
+    )
+
+
+def is_default_skip_policy() -> bool:
+    """Check whether packages are skipped only by `ISyndicate.skip_syndication`.
+
+    Only the default policy can be compiled into SQL by `candidate_packages`.
+    """
+    return all(map(_is_default_skipper, _skip_chain()))
+
+
+def _is_default_skipper(plugin: ISyndicate) -> bool:
+    return getattr(type(plugin), "skip_syndication", None) is ISyndicate.skip_syndication
+
+
+def candidate_packages(profile: Profile, packages: Query[model.Package] | None = None) -> Query[model.Package]:
+    """Select packages applicable for the profile under the default policy.
+
+    This is SQL version of `ISyndicate.skip_syndication`. Public packages are
+    selected if they are deleted and were syndicated to the profile, or if
+    they have enabled syndication flag and match `filter_*` options of the
+    profile. `packages` can be used to narrow down the selection.
+    """
+    if packages is None:
+        packages = model.Session.query(model.Package)
+
+    # aliases keep subqueries independent from joins of `packages`
+    log_record = aliased(SyndicationLog)
+    extra = aliased(model.PackageExtra)
+
+    synced = (
+        sa.exists()
+        .where(
+            log_record.local_id == model.Package.id,
+            log_record.profile_id == profile.id,
+            log_record.target_id != "-",
+        )
+        .correlate(model.Package)
+    )
+
+    flag = [
+        extra.package_id == model.Package.id,
+        extra.key == profile.flag,
+        sa.func.lower(sa.func.trim(extra.value)).in_(FLAG_TRUE_VALUES),
+    ]
+    if hasattr(model.PackageExtra, "state"):
+        flag.append(extra.state == "active")
+
+    rules = [sa.exists().where(*flag).correlate(model.Package)]
+
+    if profile.filter_organizations:
+        orgs = sa.select(model.Group.id).where(
+            sa.or_(
+                model.Group.id.in_(profile.filter_organizations),
+                model.Group.name.in_(profile.filter_organizations),
+            )
+        )
+        rules.append(model.Package.owner_org.in_(orgs))
+
+    if profile.filter_types:
+        rules.append(model.Package.type.in_(profile.filter_types))
+
+    if profile.filter_tags:
+        rules.append(
+            sa.exists()
+            .where(
+                model.PackageTag.package_id == model.Package.id,
+                model.PackageTag.state == "active",
+                model.PackageTag.tag_id == model.Tag.id,
+                model.Tag.name.in_(profile.filter_tags),
+            )
+            .correlate(model.Package)
+        )
+
+    return packages.filter(
+        model.Package.private.isnot(True),
+        sa.or_(
+            sa.and_(model.Package.state == "deleted", synced),
+            sa.and_(model.Package.state != "deleted", *rules),
+        ),
+    )
+
+
+def profile_packages(
+    profile: Profile,
+    packages: Query[model.Package] | None = None,
+    since: bool = False,
+) -> Query[model.Package]:
+    """Select packages for bulk syndication to the profile.
+
+    With the default skip policy, only applicable packages are selected.
+    Otherwise, selected packages must be checked with `profiles_for`.
+    """
+    if since:
+        packages = outdated_packages(profile.id, packages)
+
+    # default rules still apply when other plugins add their own
+    if any(map(_is_default_skipper, _skip_chain())):
+        packages = candidate_packages(profile, packages)
 
-    packages = model.Session.query(model.Package)
+    elif packages is None:
+        packages = model.Session.query(model.Package)
 
+    return packages
+
+
+class PackageStub:
+    """Lightweight package used by bulk operations instead of `model.Package`.
+
+    Only columns required by the default skip rules are loaded: ID, name,
+    owner, privacy, state, type, modification time and extras used as
+    syndication flags. When plugins implement their own skip rules, all
+    extras are loaded. Any other attribute is taken from the complete
+    package, which is loaded on demand.
+    """
+
+    def __init__(self, row: Any, extras: dict[str, str]):
+        self.id: str = row.id
+        self.name: str = row.name
+        self.owner_org: str | None = row.owner_org
+        self.private: bool = row.private
+        self.state: str = row.state
+        self.type: str = row.type
+        self.metadata_modified: dt = row.metadata_modified
+        self.extras = extras
+
+    def __getattr__(self, name: str) -> Any:
+        package = self.__dict__.get("_package")
+        if package is None:
+            package = self.__dict__["_package"] = model.Package.get(self.id)
+        return getattr(package, name)
+
+    def __repr__(self):
+        return f"<PackageStub id={self.id}>"
+
+
+def package_chunks(
+    packages: Query[model.Package] | None = None,
+    size: int | None = None,
+    after: str | None = None,
+) -> Iterator[list[PackageStub]]:
+    """Stream packages in chunks ordered by ID.
+
+    Every chunk is fetched by a separate keyset-paginated query that loads
+    only columns required by skip rules. Session is committed once the chunk
+    is processed, so deferred writes do not pile up and loaded objects can
+    be released.
+
+    IDs are compared bytewise, regardless of the database collation, so the
+    order of packages matches comparison of their IDs in Python.
+    """
+    if packages is None:
+        packages = model.Session.query(model.Package)
+
+    size = size or config.get_batch_size()
+    # custom skip rules may check any extra
+    flags = {profile.flag for profile in get_profiles()} if is_default_skip_policy() else None
+    columns = packages.with_entities(
+        model.Package.id,
+        model.Package.name,
+        model.Package.owner_org,
+        model.Package.private,
+        model.Package.state,
+        model.Package.type,
+        model.Package.metadata_modified,
+    ).order_by(_package_key)
+
+    while True:
+        query = columns if after is None else columns.filter(_package_key > after)
+        rows = query.limit(size).all()
+        if not rows:
+            return
+
+        extras: dict[str, dict[str, str]] = defaultdict(dict)
+        package_extras = model.Session.query(
+            model.PackageExtra.package_id,
+            model.PackageExtra.key,
+            model.PackageExtra.value,
+        ).filter(model.PackageExtra.package_id.in_([row.id for row in rows]))
+        if flags is not None:
+            package_extras = package_extras.filter(model.PackageExtra.key.in_(flags))
+        # some CKAN versions keep removed extras with the `deleted` state
+        if hasattr(model.PackageExtra, "state"):
+            package_extras = package_extras.filter(model.PackageExtra.state == "active")
+
+        for package_id, key, value in package_extras:
+            extras[package_id][key] = value
+
+        yield [PackageStub(row, extras[row.id]) for row in rows]
+
+        after = rows[-1].id
+        model.Session.commit()
+
+
+def iter_packages(packages: Query[model.Package] | None = None, size: int | None = None) -> Iterator[PackageStub]:
+    """Stream packages one by one. See `package_chunks`."""
+    for chunk in package_chunks(packages, size):
+        yield from chunk
+
+
+def _sync_selection(
+    pool: bulk.ForegroundSync | bulk.BackgroundSync,
+    profile: Profile,
+    replicated: set[tuple[str, str]],
+    since: bool = False,
+) -> None:
+    packages = profile_packages(profile, since=since)
+    checked = not is_default_skip_policy()
     log.info("Syncing %s packages to profile %s", packages.count(), profile.id)
 
-    for package in packages:
-        if profile not in profiles_for(package):
+    for package in iter_packages(packages):
+        if checked and profile not in profiles_for(package):
             continue
 
-        if foreground:
-            sync_package(package.id, Topic.update, profile)
-        else:
-            syndicate_dataset(package.id, Topic.update, profile)
+        replicate_organization_once(package.owner_org, profile, replicated)
+        pool.submit(package.id, profile)
+
+
+def _bulk_sync(foreground: bool, workers: int, force: bool = False) -> bulk.ForegroundSync | bulk.BackgroundSync:
+    if foreground:
+        return bulk.ForegroundSync(workers, force)
+    return bulk.BackgroundSync(force=force)
+
+
+def retry_failed() -> Counter[str]:
+    """Enqueue syndications that failed with transient errors and are due.
+
+    Profiles with open circuits are skipped: their syndications stay in the
+    log until the remote portal is healthy again. Returns number of enqueued
+    syndications per profile.
+    """
+    due = model.Session.query(SyndicationLog).filter(
+        SyndicationLog.state == SyndicationLog.State.FAILED,
+        SyndicationLog.retry_at <= dt.now(tz=tz.utc),
+    )
+    profiles = {p.id: p for p in get_profiles()}
+    paused = {id_ for id_, profile in profiles.items() if retry.CircuitBreaker(profile).open_for()}
+    results = Counter()
+
+    for record in due:
+        profile = profiles.get(record.profile_id)
+        if not profile or profile.id in paused:
+            continue
+
+        # job records the next attempt if this one fails as well
+        record.retry_at = None
+        syndicate_dataset(record.local_id, Topic.update, profile)
+        results[profile.id] += 1
+
+    model.Session.commit()
+    return results
+
+
+def replicate_organization_once(org_id: str | None, profile: Profile, replicated: set[tuple[str, str]]) -> None:
+    """Replicate organization before bulk syndication of its first dataset.
+
+    Datasets syndicated afterwards reuse the recorded remote ID, so the
+    organization is not synchronized again for each of them. `replicated`
+    collects organizations processed during the current bulk run.
+    """
+    if not org_id or not (profile.replicate_organization or profile.update_organization):
+        return
+
+    key = (profile.id, org_id)
+    if key in replicated:
+        return
+    replicated.add(key)
+
+    try:
+        tk.get_action("syndicate_sync_organization")(
+            {"ignore_auth": True},
+            {"id": org_id, "profile": profile.id, "update_existing": profile.update_organization},
+        )
+    except Exception:  # noqa: BLE001
+        log.exception("Cannot replicate organization %s to profile %s", org_id, profile.id)
+
+
+def get_remote_group(local_id: str, profile: Profile) -> str | None:
+    """Return ID of the remote copy of the group if it does not need a sync.
+
+    Remote ID is cached in-process and in the `syndication_group_map` table for
+    `ckanext.syndicate.group_cache_ttl` seconds. When the profile does not
+    update existing organizations, recorded remote ID expires only when it is
+    rejected by the remote portal, see `forget_remote_group`.
+    """
+    ttl = config.get_group_cache_ttl()
+    if ttl <= 0:
+        return None
+
+    key = (profile.id, local_id)
+    now = time.monotonic()
+    if (cached := _remote_groups.get(key)) and cached[1] > now:
+        return cached[0]
+
+    record = SyndicationGroupMap.get(local_id, profile.id)
+    if not record:
+        return None
+
+    if profile.update_organization and record.timestamp < dt.now(tz=tz.utc) - td(seconds=ttl):
+        return None
 
+    _remote_groups[key] = (record.target_id, now + ttl)
+    return record.target_id
+
+
+def remember_remote_group(local_id: str, profile: Profile, remote_id: str, image_hash: str | None = None) -> None:
+    """Record ID of the synchronized remote copy of the group."""
+    SyndicationGroupMap.write(local_id, profile.id, remote_id, image_hash)
+    _remote_groups[(profile.id, local_id)] = (remote_id, time.monotonic() + config.get_group_cache_ttl())
+
+
+def forget_remote_group(local_id: str, profile: Profile) -> None:
+    """Drop recorded ID of the remote copy of the group."""
+    SyndicationGroupMap.delete(local_id, profile.id)
+    _remote_groups.pop((profile.id, local_id), None)
+
+
+def sync_package(
+    package_id: str,
+    action: Topic | str,
+    profile: Profile | str,
+    profile_version: str | None = None,
+    force: bool = False,
+) -> dict[str, Any]:
+    """Background job that syndicates the package to the profile.
+
+    Job carries only ID and version of the profile. Options of the profile
+    are taken from the registry of the worker.
+    """
+    profile_id = profile.id if isinstance(profile, Profile) else profile
+    if pending := _claim_pending(_job_id(package_id, profile_id)):
+        action = pending["topic"]
+        force = force or "force" in pending
+
+    if not registry.resolve_job_profile(profile, profile_version):
+        return {}
+
+    if isinstance(action, str):
+        action = Topic[action]
 
-def sync_package(package_id: str, action: Topic, profile: Profile) -> None:
     log.info(
         "Sync package %s, with action %s to the %s",
         package_id,
         action.name,
-        profile.id,
+        profile_id,
     )
 
-    tk.get_action("syndicate_sync")(
+    return tk.get_action("syndicate_sync")(
         {"ignore_auth": True},
-        {"id": package_id, "topic": action.name, "profile": profile.id},
+        {"id": package_id, "topic": action.name, "profile": profile_id, "force": force},
     )
 
 
-def get_profiles(force_refresh: bool = False) -> list[Profile]:
-    """Yield all configured syndication profiles."""
-    if force_refresh:
-        _get_profiles_cached.cache_clear()
-    return _get_profiles_cached()
+def sync_package_to_profiles(  # noqa: PLR0913 PLR0917
+    package_id: str,
+    action: Topic | str,
+    profile_ids: list[str],
+    force: bool = False,
+    queue: str = jobs.DEFAULT_QUEUE_NAME,
+    versions: dict[str, str | None] | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Background job that syndicates the package to several profiles.
 
+    Local package is fetched once and shared by all profiles.
+    """
+    if pending := _claim_pending(_job_id(package_id, f"fanout:{queue}")):
+        action = pending["topic"]
+        force = force or "force" in pending
+        profile_ids = pending["profiles"].split(",")
+
+    if isinstance(action, str):
+        action = Topic[action]
+
+    versions = versions or {}
+    profile_ids = [id_ for id_ in profile_ids if registry.resolve_job_profile(id_, versions.get(id_))]
+    if not profile_ids:
+        return {}
+
+    try:
+        package = tk.get_action("package_show")(
+            {"ignore_auth": True, "use_cache": False, "validate": False},
+            {"id": package_id},
+        )
+    except tk.ObjectNotFound:
+        log.warning("Package %s does not exist and cannot be syndicated", package_id)
+        return {}
+
+    results = {}
+    with SyndicationLog.preload([package_id]):
+        for profile_id in profile_ids:
+            log.info("Sync package %s, with action %s to the %s", package_id, action.name, profile_id)
+            results[profile_id] = tk.get_action("syndicate_sync")(
+                {"ignore_auth": True, "syndicate_package": package},  # type: ignore
+                {"id": package_id, "topic": action.name, "profile": profile_id, "force": force},
+            )
 
-@lru_cache(maxsize=1)
-def _get_profiles_cached() -> list[Profile]:
-    profiles = defaultdict(dict)
+    return results
 
-    for opt, v in tk.config.items():
-        if not opt.startswith(PROFILE_PREFIX):
-            continue
 
-        profile, attr = opt[len(PROFILE_PREFIX) :].split(".", 1)
-        profiles[profile][attr] = v
+def payload_hash(data: Any) -> str:
+    """Compute stable hash of the data that is sent to the remote portal."""
+    serialized = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
 
-    return [Profile(id=id_, **data) for id_, data in profiles.items()]
+
+def get_profiles(force_refresh: bool = False) -> list[Profile]:
+    """Return all configured syndication profiles.
+
+    `force_refresh` rebuilds profiles from the config even if their options
+    did not change.
+    """
+    if force_refresh:
+        registry.profiles.reload(force=True)
+    return registry.profiles.all()
 
 
 def get_profile(profile_id: str) -> Profile | None:
     """Get a syndication profile by its ID."""
-    for profile in get_profiles():
-        if profile.id != profile_id:
-            continue
+    return registry.profiles.get(profile_id)
 
-        return profile
 
+class _SkipCache:
+    """Skip policy and decisions made during a bulk run."""
 
-def profiles_for(pkg: model.Package) -> Iterator[Profile]:
-    """Yield profiles applicable for the given package."""
-    skipper: ISyndicate = next(iter(PluginImplementations(ISyndicate)))
+    def __init__(self, chain: list[ISyndicate]):
+        self.chain = chain
+        # (package ID, modification time, profile ID) -> reason
+        self.decisions: dict[tuple[str, dt | None, str], bool | str] = {}
 
-    for profile in get_profiles():
-        if reason := skipper.skip_syndication(pkg, profile):
+
+_skip_cache: ContextVar[_SkipCache | None] = ContextVar("syndicate_skip_cache", default=None)
+
+
+@contextmanager
+def cached_skip_decisions() -> Iterator[None]:
+    """Build the skip policy once and remember its decisions.
+
+    Inside the block, `profiles_for` evaluates every combination of package
+    version and profile only once. Nested blocks reuse the outer cache.
+
+    Example:
+        with cached_skip_decisions():
+            for package in iter_packages():
+                ...
+
+    """
+    if _skip_cache.get() is not None:
+        yield
+        return
+
+    token = _skip_cache.set(_SkipCache(_skip_chain()))
+    try:
+        yield
+    finally:
+        _skip_cache.reset(token)
+
+
+def _skip_chain() -> list[ISyndicate]:
+    return list(PluginImplementations(ISyndicate))
+
+
+def _skip_reason(chain: list[ISyndicate], pkg: model.Package | PackageStub, profile: Profile) -> bool | str:
+    for plugin in chain:
+        if reason := plugin.skip_syndication(pkg, profile):
             log.debug(
                 "Plugin %s decided to skip syndication of %s for profile %s: %s",
-                skipper.name,
+                plugin.name,
                 pkg.id,
                 profile.id,
                 reason,
             )
-            SyndicationLog.write(
-                local_id=pkg.id,
-                profile_id=profile.id,
-                state=SyndicationLog.State.STOPPED,
-                defer_commit=True,
-            )
+            return reason
+
+    return False
+
+
+def profiles_for(pkg: model.Package | PackageStub) -> Iterator[Profile]:
+    """Yield profiles applicable for the given package.
+
+    Package is skipped if any implementation of `ISyndicate` skips it. Inside
+    `cached_skip_decisions` block, previous decisions are reused.
+
+    Skipped profiles get the STOPPED state in the syndication log. Only
+    changes of the state are written.
+    """
+    cache = _skip_cache.get()
+    chain = cache.chain if cache else _skip_chain()
+    applicable: list[Profile] = []
+    skipped: list[str] = []
+
+    for profile in get_profiles():
+        key = (pkg.id, pkg.metadata_modified, profile.id)
+        if cache and key in cache.decisions:
+            if not cache.decisions[key]:
+                applicable.append(profile)
             continue
-        yield profile
+
+        reason = _skip_reason(chain, pkg, profile)
+        if cache:
+            cache.decisions[key] = reason
+
+        if reason:
+            skipped.append(profile.id)
+        else:
+            applicable.append(profile)
+
+    if skipped:
+        _record_skipped(pkg.id, skipped)
+
+    yield from applicable
+
+
+def _record_skipped(package_id: str, profile_ids: list[str]) -> None:
+    states = dict(
+        model.Session.query(SyndicationLog.profile_id, SyndicationLog.state).filter(
+            SyndicationLog.local_id == package_id,
+            SyndicationLog.profile_id.in_(profile_ids),
+        )
+    )
+    keep_unsyndicated = config.get_log_unsyndicated()
+
+    SyndicationLog.bulk_write(
+        [
+            {"local_id": package_id, "profile_id": profile_id, "state": SyndicationLog.State.STOPPED}
+            for profile_id in profile_ids
+            if states.get(profile_id) != SyndicationLog.State.STOPPED and (keep_unsyndicated or profile_id in states)
+        ],
+        defer_commit=True,
+    )